@@ -0,0 +1,51 @@
+"""
+Regenerate the packaged file with the canonical forms of the common compounds.
+
+The SMILES strings given to IsAvailable are standardized before being looked
+up in the available compounds; the packaged compounds are therefore stored in
+their standardized form as well. To be executed after any modification of
+"resources/common_compounds.txt":
+
+    python -m rxn.availability._regenerate_common_compounds
+"""
+
+import logging
+from pathlib import Path
+
+from .defaults import get_compounds_from_file
+from .is_available import default_standardize_molecules
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+_RESOURCES_DIRECTORY = Path(__file__).parent / "resources"
+SOURCE_FILE = _RESOURCES_DIRECTORY / "common_compounds.txt"
+CANONICAL_FILE = _RESOURCES_DIRECTORY / "common_compounds_canonical.txt"
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+
+    canonical_compounds = set()
+    for smiles in get_compounds_from_file(SOURCE_FILE):
+        try:
+            canonical_compounds.add(default_standardize_molecules(smiles))
+        except Exception as e:
+            logger.warning(f'Cannot standardize "{smiles}", keeping it as is: {e}')
+            canonical_compounds.add(smiles)
+
+    with open(CANONICAL_FILE, "wt") as f:
+        f.write(
+            "#\n"
+            f"# Generated from {SOURCE_FILE.name} with {Path(__file__).name}.\n"
+            "# Do not edit manually.\n"
+            "#\n"
+        )
+        for smiles in sorted(canonical_compounds):
+            f.write(f"{smiles}\n")
+
+    logger.info(f'Wrote {len(canonical_compounds)} compounds to "{CANONICAL_FILE}".')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,72 @@
+import functools
 import logging
-from typing import Callable, Iterable, Iterator, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .availability_from_smarts import AvailabilityFromSmarts, MolCache
+from .availability_from_smiles import AvailabilityFromSmiles
 from .smiles_availability import AvailabilityMatch, SmilesAvailability
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
+def _any_source_batch(
+    sources: Iterable[Callable[[str], bool]], smiles_list: List[str]
+) -> List[bool]:
+    """
+    Whether any of the sources returns True, for multiple SMILES strings.
+
+    Each source is queried once for all the SMILES strings that no previous
+    source returned True for.
+    """
+    results = [False] * len(smiles_list)
+    remaining = list(range(len(smiles_list)))
+    for source in sources:
+        if not remaining:
+            break
+        subset = [smiles_list[i] for i in remaining]
+        if isinstance(source, SmilesAvailability):
+            source_results = source.is_available_batch(subset)
+        else:
+            source_results = [source(smiles) for smiles in subset]
+
+        still_remaining = []
+        for i, result in zip(remaining, source_results):
+            if result:
+                results[i] = True
+            else:
+                still_remaining.append(i)
+        remaining = still_remaining
+    return results
+
+
+def _fuse_checks(
+    source_checks: Tuple[Callable[[str], bool], ...],
+    exclusion_checks: Tuple[Callable[[str], bool], ...],
+) -> Callable[[str], bool]:
+    """
+    Create one single function deciding on the availability of a SMILES
+    string: excluded by none of the exclusion checks, and available from any
+    of the source checks.
+
+    The checks are evaluated in order, and only until the decision is known,
+    as most of them are much more expensive than the evaluation itself.
+    """
+    if not exclusion_checks and len(source_checks) == 1:
+        return source_checks[0]
+
+    def fused_check(smiles: str) -> bool:
+        for is_excluded in exclusion_checks:
+            if is_excluded(smiles):
+                return False
+        for is_available in source_checks:
+            if is_available(smiles):
+                return True
+        return False
+
+    return fused_check
+
+
 class AvailabilityCombiner(SmilesAvailability):
     """
     Query the availability of SMILES strings by combining multiple other classes.
@@ -14,8 +74,23 @@ class AvailabilityCombiner(SmilesAvailability):
     This class is useful when the availability of SMILES strings is provided
     by multiple components - for instance, it avoids calling the standardization
     multiple times.
+
+    Note: the functions to call for a query are determined when setting the
+    sources and excluded sources, depending on their configuration. Modifying
+    these lists in place, or the standardizer and compounds of the sources,
+    is therefore not supported; assign new lists instead.
     """
 
+    __slots__ = (
+        "add_source_to_match_info_key",
+        "_sources",
+        "_excluded_sources",
+        "_source_checks",
+        "_exclusion_checks",
+        "_check",
+        "_mol_cache",
+    )
+
     def __init__(
         self,
         sources: Iterable[SmilesAvailability],
@@ -33,11 +108,94 @@ class AvailabilityCombiner(SmilesAvailability):
             standardizer: see doc in base class.
         """
         super().__init__(standardizer=standardizer)
+
+        # To parse the SMILES strings only once for all the SMARTS-based sources
+        # and exclusions that do not rely on a molecule provider of their own.
+        self._mol_cache = MolCache(maxsize=1)
+
+        self._source_checks: Tuple[Callable[[str], bool], ...] = ()
+        self._exclusion_checks: Tuple[Callable[[str], bool], ...] = ()
         self.sources = list(sources)
         self.add_source_to_match_info_key = add_source_to_match_info_key
-        self.excluded_sources = (
-            [] if excluded_sources is None else list(excluded_sources)
+        self.excluded_sources = [] if excluded_sources is None else excluded_sources
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the sources: the functions for the checks are local objects,
+        # which cannot be pickled, and are created again when unpickling.
+        return {
+            "sources": self._sources,
+            "excluded_sources": self._excluded_sources,
+            "add_source_to_match_info_key": self.add_source_to_match_info_key,
+            "standardizer": self._standardizer,
+            "standardizer_cache_size": self.standardizer_cache_size,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._standardizer = state["standardizer"]
+        self.standardizer_cache_size = state["standardizer_cache_size"]
+        self.add_source_to_match_info_key = state["add_source_to_match_info_key"]
+        self._mol_cache = MolCache(maxsize=1)
+        self._source_checks = ()
+        self._exclusion_checks = ()
+        self.sources = state["sources"]
+        self.excluded_sources = state["excluded_sources"]
+
+    @property
+    def sources(self) -> List[SmilesAvailability]:
+        return self._sources
+
+    @sources.setter
+    def sources(self, sources: Iterable[SmilesAvailability]) -> None:
+        self._sources = list(sources)
+
+        # Functions called directly for the availability checks, to avoid the
+        # levels of indirection per source and per query.
+        self._source_checks = tuple(
+            self._availability_check(source) for source in self._sources
+        )
+        self._check = _fuse_checks(self._source_checks, self._exclusion_checks)
+
+    @property
+    def excluded_sources(self) -> List[Callable[[str], bool]]:
+        return self._excluded_sources
+
+    @excluded_sources.setter
+    def excluded_sources(
+        self, excluded_sources: Iterable[Callable[[str], bool]]
+    ) -> None:
+        # NOTE: contrary to the sources, for which the order determines which
+        # match comes first, the order of the exclusions does not matter; they
+        # are therefore sorted to evaluate the cheapest ones first. Simple
+        # callables (without cost attribute) are assumed to be cheap.
+        self._excluded_sources = sorted(
+            excluded_sources, key=lambda excluded: getattr(excluded, "cost", 0)
+        )
+
+        self._exclusion_checks = tuple(
+            self._availability_check(excluded) for excluded in self._excluded_sources
         )
+        self._check = _fuse_checks(self._source_checks, self._exclusion_checks)
+
+    def _availability_check(
+        self, source: Callable[[str], bool]
+    ) -> Callable[[str], bool]:
+        """Function to call for the availability of an (already standardized)
+        SMILES string from a source or exclusion.
+
+        The function is specialized for the source, skipping the layers of the
+        generic is_available() that are not needed for it."""
+        if not isinstance(source, SmilesAvailability):
+            return source
+        if source.standardizer is not None:
+            return source.is_available
+        # NOTE: exact types only, as derived classes may override the checks
+        if type(source) is AvailabilityFromSmiles:
+            return source.available_compounds.__contains__
+        if type(source) is AvailabilityFromSmarts and source.mol_provider is None:
+            return functools.partial(
+                source._is_available_with_mol_provider, mol_provider=self._mol_cache
+            )
+        return source._is_available
 
     def _find_matches(self, smiles: str) -> Iterator[AvailabilityMatch]:
         """See base class for documentation."""
@@ -45,7 +203,7 @@ class AvailabilityCombiner(SmilesAvailability):
         # Note: when it gets there, the SMILES string has already been
         # standardized (in the base class).
 
-        if any(excluded(smiles) for excluded in self.excluded_sources):
+        if self._is_excluded(smiles):
             logger.debug(f'SMILES "{smiles}" is unavailable due to exclusion rule.')
             return
 
@@ -54,3 +212,32 @@ class AvailabilityCombiner(SmilesAvailability):
                 if self.add_source_to_match_info_key is not None:
                     match.info[self.add_source_to_match_info_key] = source
                 yield match
+
+    def _is_available(self, smiles: str) -> bool:
+        """See base class for documentation."""
+        return self._check(smiles)
+
+    def _is_available_batch(self, smiles_list: List[str]) -> List[bool]:
+        """See base class for documentation."""
+        excluded = self._is_excluded_batch(smiles_list)
+        candidates = [
+            smiles
+            for smiles, is_excluded in zip(smiles_list, excluded)
+            if not is_excluded
+        ]
+        candidate_availabilities = iter(_any_source_batch(self._sources, candidates))
+        return [
+            False if is_excluded else next(candidate_availabilities)
+            for is_excluded in excluded
+        ]
+
+    def _is_excluded_batch(self, smiles_list: List[str]) -> List[bool]:
+        """Whether (already standardized) SMILES strings are excluded."""
+        return _any_source_batch(self._excluded_sources, smiles_list)
+
+    def _is_excluded(self, smiles: str) -> bool:
+        """Whether an (already standardized) SMILES string is excluded."""
+        for is_excluded in self._exclusion_checks:
+            if is_excluded(smiles):
+                return True
+        return False
@@ -1,4 +1,4 @@
-from typing import Callable, Iterator, Optional, Union
+from typing import Callable, Iterator, List, Optional, Union
 
 from .databases import DB
 from .smiles_availability import AvailabilityMatch, SmilesAvailability
@@ -9,6 +9,9 @@ class AvailabilityFromDatabase(SmilesAvailability):
     Query availability of SMILES strings from an instance of DB (such as MongoDB).
     """
 
+    cost = 3
+    __slots__ = ("database", "pricing_threshold")
+
     def __init__(
         self,
         database: DB,
@@ -28,3 +31,20 @@ class AvailabilityFromDatabase(SmilesAvailability):
             smi=smiles, pricing_threshold=self.pricing_threshold
         ):
             yield AvailabilityMatch(details="Found in the database.")
+
+    def _is_available(self, smiles: str) -> bool:
+        """See base class for documentation."""
+        return self.database.availability(
+            smi=smiles, pricing_threshold=self.pricing_threshold
+        )
+
+    def _is_available_batch(self, smiles_list: List[str]) -> List[bool]:
+        """See base class for documentation.
+
+        Contrary to the default implementation, this requires one single
+        request to the database.
+        """
+        availabilities = self.database.availability_batch(
+            smis=smiles_list, pricing_threshold=self.pricing_threshold
+        )
+        return [availabilities[smiles] for smiles in smiles_list]
@@ -1,30 +1,325 @@
-from typing import Callable, Iterable, Iterator, Optional
+import functools
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from rdkit.Chem import MolFromSmarts, MolFromSmiles
+from rdkit.Chem import (
+    ChiralType,
+    Mol,
+    MolFromSmarts,
+    MolFromSmiles,
+    SubstructMatchParameters,
+)
 
 from .smiles_availability import AvailabilityMatch, SmilesAvailability
 
 
+def _substructure_match_parameters(
+    use_chirality: bool = False,
+) -> SubstructMatchParameters:
+    """
+    Parameters for the substructure matching: a match is only needed to know
+    that it exists, so that RDKit can stop after the first one.
+
+    Args:
+        use_chirality: whether to consider the chirality. Only needed for the
+            patterns specifying it, as it makes the matching slower.
+    """
+    parameters = SubstructMatchParameters()
+    # Note: the type stubs of RDKit wrongly annotate these properties.
+    parameters.maxMatches = 1  # type: ignore[assignment]
+    parameters.useChirality = use_chirality  # type: ignore[assignment]
+    return parameters
+
+
+def _has_chirality(pattern: Mol) -> bool:
+    """Whether a SMARTS pattern specifies the chirality of any of its atoms."""
+    return any(
+        atom.GetChiralTag() != ChiralType.CHI_UNSPECIFIED for atom in pattern.GetAtoms()
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_smarts(smarts: str) -> Mol:
+    """
+    Compile a SMARTS pattern, keeping the most recent ones in memory.
+
+    The patterns are shared between all the instances of AvailabilityFromSmarts
+    (in the same process), and must therefore not be modified.
+
+    Raises:
+        ValueError: for invalid SMARTS patterns (not cached).
+    """
+    pattern = MolFromSmarts(smarts)
+    if pattern is None:
+        raise ValueError(f'Invalid SMARTS "{smarts}".')
+    return pattern
+
+
+def _combine_smarts(smarts: List[str]) -> Optional[Mol]:
+    """
+    Combine SMARTS patterns into one single recursive SMARTS, "[$(P1),$(P2),...]".
+
+    The combined pattern matches a molecule if and only if one of the patterns
+    matches it, which allows for one single substructure search instead of
+    one per pattern.
+
+    Returns:
+        The combined pattern, or None if the patterns cannot be combined
+        (fewer than two patterns, disconnected patterns, parsing error).
+    """
+    if len(smarts) < 2:
+        return None
+
+    # Recursive SMARTS must be connected
+    if any("." in s for s in smarts):
+        return None
+
+    try:
+        return _compile_smarts("[" + ",".join(f"$({s})" for s in smarts) + "]")
+    except ValueError:
+        return None
+
+
+class MolCache:
+    """
+    Convert SMILES strings to RDKit molecules, keeping the most recent ones
+    in memory.
+
+    Useful to share the parsed molecules between several instances of
+    AvailabilityFromSmarts that are queried for the same SMILES strings.
+    The molecules must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args:
+            maxsize: number of molecules to keep in memory.
+        """
+        self.maxsize = maxsize
+        self._parse = functools.lru_cache(maxsize=maxsize)(MolFromSmiles)
+
+    def __call__(self, smiles: str) -> Optional[Mol]:
+        return self._parse(smiles)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The cached molecules are not pickled
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        MolCache.__init__(self, **state)
+
+
 class AvailabilityFromSmarts(SmilesAvailability):
     """
     Query availability of SMILES strings from SMARTS matching.
     """
 
+    cost = 4
+    # NOTE: the patterns and the related data are stored in parallel lists,
+    # so that the loops over the patterns do not unpack tuples.
+    __slots__ = (
+        "mol_provider",
+        "_smarts",
+        "_details",
+        "_patterns",
+        "_pattern_parameters",
+        "_combined_pattern",
+        "_check_patterns",
+        "_check_parameters",
+        "_match_parameters",
+    )
+
     def __init__(
         self,
         smarts: Iterable[str],
         standardizer: Optional[Callable[[str], str]] = None,
+        mol_provider: Optional[Callable[[str], Optional[Mol]]] = None,
     ):
+        """
+        Args:
+            smarts: SMARTS patterns for the available compounds.
+            standardizer: see doc in base class.
+            mol_provider: function to convert the SMILES strings to RDKit
+                molecules, such as an instance of MolCache. Defaults to
+                parsing them with RDKit on every query.
+        """
         super().__init__(standardizer=standardizer)
 
-        self.available_smarts = [(MolFromSmarts(s), s) for s in smarts]
+        self.mol_provider = mol_provider
+        self._compile(smarts)
+
+    @property
+    def available_smarts(self) -> List[Tuple[Mol, str]]:
+        """The compiled patterns, together with their SMARTS strings."""
+        return list(zip(self._patterns, self._smarts))
+
+    @property
+    def match_details(self) -> List[str]:
+        """The details of the matches for each pattern, as indexed by
+        find_match_indices()."""
+        return self._details
+
+    def _compile(self, smarts: Iterable[str]) -> None:
+        """Compile the SMARTS patterns and everything derived from them."""
+        self._smarts: List[str] = list(smarts)
+        self._patterns: List[Mol] = [_compile_smarts(s) for s in self._smarts]
+        # Formatted once, instead of for every match
+        self._details: List[str] = [f'Matching SMARTS "{s}".' for s in self._smarts]
+
+        # The chirality is ignored, except for the patterns specifying it
+        self._match_parameters = _substructure_match_parameters()
+        chiral_match_parameters = _substructure_match_parameters(use_chirality=True)
+        self._pattern_parameters = [
+            (
+                chiral_match_parameters
+                if _has_chirality(pattern)
+                else self._match_parameters
+            )
+            for pattern in self._patterns
+        ]
+        any_chirality = any(
+            parameters is chiral_match_parameters
+            for parameters in self._pattern_parameters
+        )
+
+        # For the availability checks (without matches), where the order of
+        # the patterns does not matter: the largest, most specific patterns
+        # come first, as they are the most likely to settle the query early.
+        num_atoms = [pattern.GetNumAtoms() for pattern in self._patterns]
+        sorted_indices = sorted(range(len(self._patterns)), key=lambda i: -num_atoms[i])
+        self._combined_pattern = (
+            None
+            if any_chirality
+            else _combine_smarts([self._smarts[i] for i in sorted_indices])
+        )
+        if self._combined_pattern is None:
+            self._check_patterns = [self._patterns[i] for i in sorted_indices]
+            self._check_parameters = [
+                self._pattern_parameters[i] for i in sorted_indices
+            ]
+        else:
+            self._check_patterns = [self._combined_pattern]
+            self._check_parameters = [self._match_parameters]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the SMARTS strings: the RDKit objects are not (efficiently)
+        # picklable, and are compiled again - or taken from the cache of
+        # compiled patterns - when unpickling.
+        return {
+            "smarts": self._smarts,
+            "standardizer": self._standardizer,
+            "standardizer_cache_size": self.standardizer_cache_size,
+            "mol_provider": self.mol_provider,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._standardizer = state["standardizer"]
+        self.standardizer_cache_size = state["standardizer_cache_size"]
+        self.mol_provider = state["mol_provider"]
+        self._compile(state["smarts"])
+
+    def find_match_indices(self, smiles: str) -> List[int]:
+        """
+        Find the SMARTS patterns matching a SMILES string.
+
+        Lighter alternative to find_matches(), for callers needing all the
+        matches but not AvailabilityMatch objects.
+
+        Args:
+            smiles: SMILES string to get the matches for.
+
+        Returns:
+            Indices of the matching patterns, in the order of the SMARTS
+            strings given at initialization. The corresponding details are
+            given by match_details.
+        """
+        standardized_smiles = self._standardize(smiles)
+        if standardized_smiles is None:
+            return []
+        return list(self._iter_match_indices(standardized_smiles))
 
     def _find_matches(self, smiles: str) -> Iterator[AvailabilityMatch]:
         """See base class for documentation."""
-        molecule = MolFromSmiles(smiles)
+        for i in self._iter_match_indices(smiles):
+            yield AvailabilityMatch(details=self._details[i])
+
+    def _iter_match_indices(self, smiles: str) -> Iterator[int]:
+        """Indices of the patterns matching an (already standardized) SMILES
+        string, lazily evaluated for the callers stopping at the first one."""
+        # No need to parse the molecule without patterns (frequent for the
+        # substructures to exclude, that are empty by default)
+        if not self._check_patterns:
+            return
+
+        molecule = self._to_molecule(smiles)
         if not molecule:
             return
 
-        for pattern, smarts in self.available_smarts:
-            if molecule.HasSubstructMatch(pattern):
-                yield AvailabilityMatch(details=f'Matching SMARTS "{smarts}".')
+        if self._combined_pattern is not None and not molecule.HasSubstructMatch(
+            self._combined_pattern, self._match_parameters
+        ):
+            return
+
+        for i, pattern in enumerate(self._patterns):
+            if molecule.HasSubstructMatch(pattern, self._pattern_parameters[i]):
+                yield i
+
+    def _is_available(self, smiles: str) -> bool:
+        """See base class for documentation."""
+        return self._is_available_with_mol_provider(smiles, self._to_molecule)
+
+    def _is_available_with_mol_provider(
+        self, smiles: str, mol_provider: Callable[[str], Optional[Mol]]
+    ) -> bool:
+        """
+        Same as _is_available(), with the given function to convert the
+        SMILES string to an RDKit molecule.
+
+        This allows callers querying several instances for the same SMILES
+        string to parse it only once.
+        """
+        if not self._check_patterns:
+            return False
+
+        molecule = mol_provider(smiles)
+        if not molecule:
+            return False
+
+        if self._combined_pattern is not None:
+            return molecule.HasSubstructMatch(
+                self._combined_pattern, self._match_parameters
+            )
+
+        return any(
+            molecule.HasSubstructMatch(pattern, parameters)
+            for pattern, parameters in zip(self._check_patterns, self._check_parameters)
+        )
+
+    def _is_available_batch(self, smiles_list: List[str]) -> List[bool]:
+        """See base class for documentation."""
+        if not self._check_patterns:
+            return [False] * len(smiles_list)
+        return self._check_molecules([self._to_molecule(s) for s in smiles_list])
+
+    def _check_molecules(self, molecules: List[Optional[Mol]]) -> List[bool]:
+        """
+        Whether the given molecules (None for invalid SMILES strings) match
+        any of the SMARTS patterns.
+
+        The patterns are applied one after the other on all the molecules not
+        matched yet.
+        """
+        matches = [False] * len(molecules)
+        for pattern, parameters in zip(self._check_patterns, self._check_parameters):
+            for i, molecule in enumerate(molecules):
+                if (
+                    not matches[i]
+                    and molecule
+                    and molecule.HasSubstructMatch(pattern, parameters)
+                ):
+                    matches[i] = True
+        return matches
+
+    def _to_molecule(self, smiles: str) -> Optional[Mol]:
+        if self.mol_provider is not None:
+            return self.mol_provider(smiles)
+        return MolFromSmiles(smiles)
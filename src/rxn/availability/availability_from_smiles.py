@@ -1,23 +1,97 @@
-from typing import Callable, Iterable, Iterator, Optional
+import collections.abc
+import sys
+from typing import Callable, Container, Iterable, Iterator, Optional, Union, cast
 
 from .smiles_availability import AvailabilityMatch, SmilesAvailability
 
 
+def _is_prebuilt_container(compounds: object) -> bool:
+    """Whether the compounds are given as a pre-built structure for lookups,
+    rather than as a collection of SMILES strings to convert to a set.
+
+    Only the containers that cannot be iterated over are used as is: for the
+    iterable ones (pandas Series, numpy arrays, dictionary views, etc.), the
+    "in" operator may be slow, or may not even check the SMILES strings.
+    """
+    return isinstance(compounds, collections.abc.Container) and not isinstance(
+        compounds, collections.abc.Iterable
+    )
+
+
 class AvailabilityFromSmiles(SmilesAvailability):
     """
     Query availability of SMILES strings from exact matches.
     """
 
+    cost = 1
+    __slots__ = ("available_compounds",)
+
     def __init__(
         self,
-        compounds: Iterable[str],
+        compounds: Union[Iterable[str], Container[str]],
         standardizer: Optional[Callable[[str], str]] = None,
+        standardizer_cache_size: int = 0,
+        standardize_compounds: bool = False,
     ):
-        super().__init__(standardizer=standardizer)
+        """
+        Args:
+            compounds: the available compounds. Either an iterable over SMILES
+                strings (list, set, generator, etc.), or a pre-built structure
+                supporting the "in" operator but not iteration, which is then
+                used as is. The latter allows for memory-efficient alternatives
+                to Python sets, such as BloomFilter or CompoundIndex, for large
+                numbers of compounds.
+            standardizer: see doc in base class.
+            standardizer_cache_size: see doc in base class.
+            standardize_compounds: whether to also standardize the available
+                compounds, for catalogs with non-canonical SMILES strings.
+                Empty strings, and the compounds that cannot be standardized,
+                are then ignored. Requires a standardizer; not applicable to
+                pre-built structures.
+        """
+        if standardize_compounds and standardizer is None:
+            raise ValueError("Standardizing the compounds requires a standardizer.")
+        super().__init__(
+            standardizer=standardizer, standardizer_cache_size=standardizer_cache_size
+        )
+
+        self.available_compounds: Container[str]
+        if _is_prebuilt_container(compounds):
+            self.available_compounds = cast(Container[str], compounds)
+        else:
+            smiles_strings = cast(Iterable[str], compounds)
+            if standardize_compounds:
+                smiles_strings = self._standardize_compounds(smiles_strings)
+            # Interned strings: the lookup of an identical (interned) query string
+            # is then settled by an identity check instead of a string comparison.
+            self.available_compounds = frozenset(sys.intern(s) for s in smiles_strings)
 
-        self.available_compounds = set(compounds)
+    def _standardize_compounds(self, compounds: Iterable[str]) -> Iterator[str]:
+        for smiles in compounds:
+            if not smiles:
+                continue
+            standardized_smiles = self._standardize(smiles)
+            if standardized_smiles is not None:
+                yield standardized_smiles
+
+    def _pre_standardization_check(self, smiles: str) -> Optional[AvailabilityMatch]:
+        """See base class for documentation.
+
+        A SMILES string present as is in the available compounds is available,
+        there is no need to standardize it.
+        """
+        if smiles in self.available_compounds:
+            return self._match(smiles)
+        return None
 
     def _find_matches(self, smiles: str) -> Iterator[AvailabilityMatch]:
         """See base class for documentation."""
         if smiles in self.available_compounds:
-            yield AvailabilityMatch(details=f'Matching exact SMILES, "{smiles}".')
+            yield self._match(smiles)
+
+    def _is_available(self, smiles: str) -> bool:
+        """See base class for documentation."""
+        return smiles in self.available_compounds
+
+    def _match(self, smiles: str) -> AvailabilityMatch:
+        return AvailabilityMatch(details=f'Matching exact SMILES, "{smiles}".')
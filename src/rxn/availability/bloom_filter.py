@@ -0,0 +1,135 @@
+import hashlib
+import math
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+def _blake2b_128(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "little")
+
+
+# 128-bit hash functions for the bit positions. xxh3 is several times faster
+# than blake2b, but requires the optional xxhash package.
+_HASH_FUNCTIONS: Dict[str, Callable[[bytes], int]] = {"blake2b": _blake2b_128}
+try:
+    import xxhash
+
+    _HASH_FUNCTIONS["xxh3_128"] = xxhash.xxh3_128_intdigest
+except ImportError:
+    pass
+
+_MASK_64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    Compact, probabilistic set of strings.
+
+    The membership test may return false positives (with a probability given
+    by the error rate), but never false negatives. This makes it possible to
+    store millions of available compounds in a few bytes each, instead of the
+    ~100 bytes per string in a Python set.
+
+    The filter supports the "in" operator and can therefore be given as the
+    compounds of AvailabilityFromSmiles. It is not suited for the excluded
+    compounds, though: a false positive would exclude an available compound.
+    """
+
+    def __init__(
+        self, capacity: int, error_rate: float = 0.01, hash_name: Optional[str] = None
+    ):
+        """
+        Args:
+            capacity: expected number of items. Adding more items increases
+                the rate of false positives.
+            error_rate: probability of false positives, for the given capacity.
+            hash_name: hash function for the bit positions, "xxh3_128" or
+                "blake2b". Defaults to xxh3_128 if the xxhash package is
+                installed, else to blake2b. A filter must be queried with the
+                same hash function as the one it was built with.
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError(f"Invalid error rate for a Bloom filter: {error_rate}.")
+        if hash_name is None:
+            hash_name = "xxh3_128" if "xxh3_128" in _HASH_FUNCTIONS else "blake2b"
+        if hash_name not in _HASH_FUNCTIONS:
+            raise ValueError(f'Hash function "{hash_name}" is not available.')
+        self.hash_name = hash_name
+        self._hash = _HASH_FUNCTIONS[hash_name]
+
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+
+        # Optimal number of bits and of hash functions
+        self.num_bits = math.ceil(
+            -self.capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    @classmethod
+    def from_items(
+        cls,
+        items: Iterable[str],
+        error_rate: float = 0.01,
+        hash_name: Optional[str] = None,
+    ) -> "BloomFilter":
+        """
+        Create a Bloom filter holding the given items, sized for them.
+
+        Args:
+            items: strings to add to the filter.
+            error_rate: probability of false positives.
+            hash_name: see __init__.
+        """
+        items = list(items)
+        bloom_filter = cls(
+            capacity=len(items), error_rate=error_rate, hash_name=hash_name
+        )
+        bloom_filter.update(items)
+        return bloom_filter
+
+    def add(self, item: str) -> None:
+        """Add a string to the filter."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        """Add multiple strings to the filter."""
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, str):
+            return False
+        # NOTE: same as iterating over _positions(), without the generator
+        # overhead, and stopping at the first unset bit.
+        digest = self._hash(item.encode())
+        h1 = digest & _MASK_64
+        h2 = (digest >> 64) | 1
+        bits = self._bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        """Number of strings added to the filter (including duplicates)."""
+        return self._count
+
+    def _positions(self, item: str) -> Iterator[int]:
+        """
+        Positions of the bits for the given string.
+
+        The positions are derived from one single 128-bit hash, split into
+        two 64-bit hashes combined linearly (Kirsch-Mitzenmacher).
+        """
+        digest = self._hash(item.encode())
+        h1 = digest & _MASK_64
+        h2 = (digest >> 64) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
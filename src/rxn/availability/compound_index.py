@@ -0,0 +1,114 @@
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Iterable, Sequence, Union
+
+# File layout: magic bytes, number of compounds (n), n + 1 offsets (relative
+# to the start of the data), and the data: the sorted, UTF-8-encoded SMILES
+# strings, concatenated.
+_MAGIC = b"RXNCIDX1"
+_COUNT = struct.Struct("<Q")
+_OFFSET = struct.Struct("<Q")
+
+
+def write_compound_index(compounds: Iterable[str], path: Union[Path, str]) -> None:
+    """
+    Write compounds to a file that can be loaded as a CompoundIndex.
+
+    The compounds are written as is; they must therefore already be in the
+    form used for the lookups (typically: standardized).
+
+    Args:
+        compounds: SMILES strings to write. Duplicates are removed.
+        path: where to write the index.
+    """
+    encoded = sorted({smiles.encode() for smiles in compounds})
+
+    offsets = [0]
+    for smiles in encoded:
+        offsets.append(offsets[-1] + len(smiles))
+
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_COUNT.pack(len(encoded)))
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+        for smiles in encoded:
+            f.write(smiles)
+
+
+class CompoundIndex:
+    """
+    Sorted set of compounds, read from a file (see write_compound_index())
+    that is memory-mapped instead of loaded.
+
+    The creation is immediate, whatever the number of compounds, and the
+    memory is shared by all the processes using the same file. Lookups are
+    binary searches, slower than for a Python set, but exact - contrary to
+    BloomFilter.
+
+    The index supports the "in" operator and can therefore be given as the
+    compounds of AvailabilityFromSmiles.
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        """
+        Args:
+            path: file written with write_compound_index().
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._buffer[: len(_MAGIC)] != _MAGIC:
+            raise ValueError(f'"{self.path}" is not a compound index.')
+        (self._count,) = _COUNT.unpack_from(self._buffer, len(_MAGIC))
+        offsets_start = len(_MAGIC) + _COUNT.size
+        self._data_start = offsets_start + (self._count + 1) * _OFFSET.size
+
+        # The offsets are read directly from the memory-mapped file if the
+        # byte order allows it, otherwise they are loaded.
+        self._offsets: Sequence[int]
+        if sys.byteorder == "little":
+            self._offsets = memoryview(self._buffer)[
+                offsets_start : self._data_start
+            ].cast("Q")
+        else:
+            self._offsets = [
+                offset
+                for (offset,) in _OFFSET.iter_unpack(
+                    self._buffer[offsets_start : self._data_start]
+                )
+            ]
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, str):
+            return False
+        target = item.encode()
+        buffer = self._buffer
+        offsets = self._offsets
+        data_start = self._data_start
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            compound = buffer[
+                data_start + offsets[middle] : data_start + offsets[middle + 1]
+            ]
+            if compound < target:
+                low = middle + 1
+            elif compound > target:
+                high = middle
+            else:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Release the memory-mapped file."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._buffer.close()
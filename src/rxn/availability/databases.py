@@ -1,25 +1,117 @@
-import functools
+import atexit
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import threading
+from collections import defaultdict
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 import pymongo
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
 from pymongo import MongoClient
+from pymongo.collection import Collection
 from rxn.utilities.databases.pymongo import PyMongoSettings
 
 from .config import Settings, get_settings
+from .utils import LRUCache
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
+# Mongo clients, shared by all the MongoDB instances connecting to the same URL
+_CLIENT_CACHE: Dict[Tuple[str, Optional[str]], MongoClient] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def _get_mongo_client(url: str, tls_ca_certificate_path: Optional[str]) -> MongoClient:
+    """Get the Mongo client for the given URL, creating it if needed.
+
+    MongoClient is thread-safe and maintains its own connection pool, so that
+    a single instance is needed per URL. The pool options (maxPoolSize, etc.)
+    can be given in the URL.
+    """
+    key = (url, tls_ca_certificate_path)
+    with _CLIENT_CACHE_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = PyMongoSettings.instantiate_client(
+                mongo_uri=url, tls_ca_certificate_path=tls_ca_certificate_path
+            )
+            _CLIENT_CACHE[key] = client
+        return client
+
+
+def _forget_mongo_clients() -> None:
+    """Forget the Mongo clients of the parent process, in a forked child.
+
+    MongoClient is not fork-safe: each process must create its own clients.
+    The clients are not closed, as they still belong to the parent process.
+    """
+    global _CLIENT_CACHE_LOCK
+    _CLIENT_CACHE.clear()
+    # The lock may have been held by another thread of the parent at fork time
+    _CLIENT_CACHE_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # Not available on Windows
+    os.register_at_fork(after_in_child=_forget_mongo_clients)
+
+
+@atexit.register
+def _close_mongo_clients() -> None:
+    with _CLIENT_CACHE_LOCK:
+        for client in _CLIENT_CACHE.values():
+            client.close()
+        _CLIENT_CACHE.clear()
+
+
 class DBConfig(BaseModel):
     uri: str
     database: str
     collection: str
     tls_ca_certificate_path: Optional[str] = None
 
+    model_config = ConfigDict(frozen=True)
+
+
+# Validates the configurations of all the databases in one go
+_DB_CONFIGS_ADAPTER = TypeAdapter(Dict[str, DBConfig])
+
+
+class _Prices(NamedTuple):
+    """Prices of a molecule in a database, as needed to determine its availability.
+
+    Only the lowest price is kept: whatever the pricing threshold, it decides
+    on the availability, which then requires one single comparison.
+
+    Attributes:
+        found: whether the molecule is in the database at all.
+        min_price: the lowest of the prices that are numbers (the DB contains
+            also "NA"), None if there is no such price.
+    """
+
+    found: bool
+    min_price: Optional[float]
+
+    @classmethod
+    def from_db_results(cls, prices: List[Any]) -> "_Prices":
+        return cls(
+            found=len(prices) > 0,
+            min_price=min(
+                (p for p in prices if isinstance(p, (int, float))), default=None
+            ),
+        )
+
 
 class DB:
     def __init__(self, url: str):
@@ -28,20 +120,60 @@ class DB:
     def availability(self, smi: str, pricing_threshold: int = 0) -> bool:
         raise NotImplementedError("Please use MongoDB instead of the DB Base class.")
 
+    def availability_batch(
+        self, smis: Iterable[str], pricing_threshold: int = 0
+    ) -> Dict[str, bool]:
+        """Determines the availability of multiple molecules.
+
+        Derived classes may override this to query all the molecules at once.
+
+        Args:
+            smis: the molecules to check.
+            pricing_threshold: the threshold in USD per g/L.
+
+        Returns:
+            dictionary with the availability for each of the given molecules.
+        """
+        return {
+            smi: self.availability(smi=smi, pricing_threshold=pricing_threshold)
+            for smi in smis
+        }
+
 
 class MongoDB(DB):
     def __init__(
-        self, url: str, db: str, collection: str, tls_ca_certificate_path: Optional[str]
+        self,
+        url: str,
+        db: str,
+        collection: str,
+        tls_ca_certificate_path: Optional[str],
+        cache_size: int = 8192,
+        cache_ttl: Optional[float] = 3600,
     ):  # For mongo we give directly the connection url
+        """
+        Args:
+            url: connection URL.
+            db: name of the database.
+            collection: name of the collection.
+            tls_ca_certificate_path: optional path to an SSL CA certificate.
+            cache_size: number of molecules for which to keep the prices in memory.
+            cache_ttl: time (in seconds) after which the cached prices expire.
+        """
         super().__init__(url=url)
         self.db = db
         self.collection = collection
         self.tls_ca_certificate_path = tls_ca_certificate_path
-        self.mongo_client: MongoClient = PyMongoSettings.instantiate_client(
-            mongo_uri=self.url, tls_ca_certificate_path=self.tls_ca_certificate_path
+        self.mongo_client: MongoClient = _get_mongo_client(
+            url=self.url, tls_ca_certificate_path=self.tls_ca_certificate_path
+        )
+        # Set on first access, see _get_collection()
+        self._collection: Optional[Collection] = None
+
+        # Only the prices are cached (not the whole documents), keyed by SMILES
+        self._prices_cache: LRUCache[str, _Prices] = LRUCache(
+            maxsize=cache_size, ttl=cache_ttl
         )
 
-    @functools.lru_cache(maxsize=2**9)
     def query_by_smi(self, smi: str) -> List[Dict[str, Any]]:
         """Fetch info by SMILES in the database.
 
@@ -49,18 +181,59 @@ class MongoDB(DB):
             smi: the molecule to check.
 
         Returns:
-            a list of matching SMILES with the corresponding metadata.
+            a list of matching entries, containing only the price.
         """
 
         logger.debug(f"Fetch information for {smi} in database.")
 
-        collection = self.mongo_client[self.db][self.collection]
+        return list(
+            self._get_collection().find(
+                {"smile": smi}, projection={"price_per_amount": 1, "_id": 0}
+            )
+        )
+
+    def _get_collection(self) -> Collection:
+        """Get the collection to query, creating the index on first access.
+
+        The index is created here rather than in the constructor, so that
+        instantiating the class does not require a connection to the database.
+        """
+        if self._collection is None:
+            collection = self.mongo_client[self.db][self.collection]
 
-        # Create index for smiles -- By default, indexes are created only if missing
-        logger.debug('Creating index for "smiles" key if it does not exist')
-        collection.create_index([("smiles", pymongo.HASHED)])
+            # By default, indexes are created only if missing
+            logger.debug('Creating index for "smile" key if it does not exist')
+            collection.create_index([("smile", pymongo.HASHED)])
 
-        return list(collection.find({"smile": smi}))
+            self._collection = collection
+        return self._collection
+
+    def query_by_smi_batch(
+        self, smis: Iterable[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch info for multiple SMILES in the database, with one single query.
+
+        Args:
+            smis: the molecules to check.
+
+        Returns:
+            dictionary with the matching entries (only the SMILES and the price)
+            for each of the given molecules.
+        """
+        unique_smis = list(dict.fromkeys(smis))
+        logger.debug(f"Fetch information for {len(unique_smis)} SMILES in database.")
+
+        if not unique_smis:
+            return {}
+
+        results: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for item in self._get_collection().find(
+            {"smile": {"$in": unique_smis}},
+            projection={"smile": 1, "price_per_amount": 1, "_id": 0},
+        ):
+            results[item["smile"]].append(item)
+
+        return {smi: results[smi] for smi in unique_smis}
 
     def availability(self, smi: str, pricing_threshold: int = 0) -> bool:
         """Determines whether or not the given molecule `smi` is commercially available,
@@ -79,34 +252,75 @@ class MongoDB(DB):
 
         logger.debug(f"Check availability for {smi} in database.")
 
-        results = [item["price_per_amount"] for item in self.query_by_smi(smi=smi)]
+        prices = self._prices_cache.get(smi)
+        if prices is None:
+            prices = _Prices.from_db_results(
+                [item["price_per_amount"] for item in self.query_by_smi(smi=smi)]
+            )
+            self._prices_cache.put(smi, prices)
 
-        is_available = self._availability_from_db_results(results, pricing_threshold)
+        is_available = self._availability_from_prices(prices, pricing_threshold)
         logger.debug(
             f"Done checking for {smi} in database (is_available: {str(is_available)})."
         )
         return is_available
 
-    def _availability_from_db_results(
-        self, prices: List[Any], pricing_threshold: int
+    def availability_batch(
+        self, smis: Iterable[str], pricing_threshold: int = 0
+    ) -> Dict[str, bool]:
+        """See base class for documentation.
+
+        All the molecules not cached yet are queried with one single request
+        to the database.
+        """
+        return {
+            smi: self._availability_from_prices(prices, pricing_threshold)
+            for smi, prices in self._get_prices_batch(smis).items()
+        }
+
+    def warmup(self, smis: Iterable[str]) -> None:
+        """Fill the cache for the given molecules, with one single request.
+
+        Args:
+            smis: the molecules for which to fetch the prices.
+        """
+        self._get_prices_batch(smis)
+
+    def _get_prices_batch(self, smis: Iterable[str]) -> Dict[str, _Prices]:
+        """Get the prices for multiple molecules, from the cache if possible."""
+        prices_dict: Dict[str, Optional[_Prices]] = {
+            smi: self._prices_cache.get(smi) for smi in smis
+        }
+
+        missing = [smi for smi, prices in prices_dict.items() if prices is None]
+        for smi, items in self.query_by_smi_batch(missing).items():
+            prices = _Prices.from_db_results(
+                [item["price_per_amount"] for item in items]
+            )
+            self._prices_cache.put(smi, prices)
+            prices_dict[smi] = prices
+
+        return {
+            smi: prices for smi, prices in prices_dict.items() if prices is not None
+        }
+
+    def _availability_from_prices(
+        self, prices: _Prices, pricing_threshold: int
     ) -> bool:
         # False if nothing found in the DB
-        if len(prices) == 0:
+        if not prices.found:
             return False
 
         # True if pricing threshold not set or set to max
         if pricing_threshold == 0 or pricing_threshold == 1000:
             return True
 
-        # keep only the numbers (DB contains also "NA")
-        valid_prices = [p for p in prices if isinstance(p, (int, float))]
-
         # False if no price left
-        if len(valid_prices) == 0:
+        if prices.min_price is None:
             return False
 
         # True if the lowest price is under the threshold
-        return min(valid_prices) < pricing_threshold
+        return prices.min_price < pricing_threshold
 
 
 def initialize_databases_from_environment_variables() -> Dict[str, DB]:
@@ -129,19 +343,19 @@ def initialize_databases_from_environment_variables() -> Dict[str, DB]:
     else:
         with open(settings.database_config_path) as json_file:
             database_config = json.load(json_file)
-            for database in database_config:
-                try:
-                    db_config = DBConfig.parse_obj(database_config[database])
-                except ValidationError:
-                    logger.error(
-                        f"Database configuration problem. Check if the file at {settings.database_config_path} has the right configuration format for all databases."
-                    )
-                    raise
-                new_db = MongoDB(
-                    url=db_config.uri,
-                    db=db_config.database,
-                    collection=db_config.collection,
-                    tls_ca_certificate_path=db_config.tls_ca_certificate_path,
-                )
-                databases[database] = new_db
+        try:
+            db_configs = _DB_CONFIGS_ADAPTER.validate_python(database_config)
+        except ValidationError:
+            logger.error(
+                f"Database configuration problem. Check if the file at {settings.database_config_path} has the right configuration format for all databases."
+            )
+            raise
+        for database, db_config in db_configs.items():
+            new_db = MongoDB(
+                url=db_config.uri,
+                db=db_config.database,
+                collection=db_config.collection,
+                tls_ca_certificate_path=db_config.tls_ca_certificate_path,
+            )
+            databases[database] = new_db
     return databases
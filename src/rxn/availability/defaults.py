@@ -8,20 +8,24 @@ import importlib_resources
 def default_available_regexes() -> List[Pattern]:
     """Get regex patterns for always available compounds.
 
+    The patterns are all anchored and merged into one single regex, so that
+    each SMILES string requires one single search.
+
     Returns:
         a list of regex patterns.
     """
-    return [
+    alternatives = [
         # Get all ions
-        re.compile(r"^\[\w{1,3}[+-]\d?\]$"),
+        r"^\[\w{1,3}[+-]\d?\]$",
         # Get Single and double elements (e.g: O2)
-        re.compile(r"^([A-Z][a-z]?){1,2}$"),
+        r"^(?:[A-Z][a-z]?){1,2}$",
         # Get Single and double elements in squared parentheses
-        re.compile(r"^(\[[A-Z][a-z]?\]){1,2}$"),
+        r"^(?:\[[A-Z][a-z]?\]){1,2}$",
         # Matches stuff like [HH], [BrBr]
-        re.compile(r"^\[([A-Z][a-z]?){1,2}\]$"),
-        re.compile(r"^[A-Z].?[A-Z]$"),
+        r"^\[(?:[A-Z][a-z]?){1,2}\]$",
+        r"^[A-Z].?[A-Z]$",
     ]
+    return [re.compile("|".join(f"(?:{a})" for a in alternatives))]
 
 
 def default_available_smarts_patterns() -> List[str]:
@@ -65,10 +69,12 @@ def common_biochemical_byproducts() -> Set[str]:
 def default_available_compounds() -> Set[str]:
     """Get common available compounds that are not part of a commercial compound database.
 
+    The compounds are in their standardized form (see _regenerate_common_compounds.py).
+
     Returns:
         a set of SMILES.
     """
-    return _get_compounds_from_packaged_file("common_compounds.txt")
+    return _get_compounds_from_packaged_file("common_compounds_canonical.txt")
 
 
 def _get_compounds_from_packaged_file(packaged_file_name: str) -> Set[str]:
@@ -1,15 +1,32 @@
 import logging
+import sys
 from collections import OrderedDict
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
 
 from rxn.chemutils.smiles_standardization import standardize_molecules
 
-from .availability_combiner import AvailabilityCombiner
+from .availability_combiner import AvailabilityCombiner, _any_source_batch
 from .availability_from_database import AvailabilityFromDatabase
 from .availability_from_regex import AvailabilityFromRegex
-from .availability_from_smarts import AvailabilityFromSmarts
+from .availability_from_smarts import AvailabilityFromSmarts, MolCache
 from .availability_from_smiles import AvailabilityFromSmiles
+from .compound_index import CompoundIndex
 from .databases import initialize_databases_from_environment_variables
 from .defaults import (
     common_biochemical_byproducts,
@@ -19,7 +36,12 @@ from .defaults import (
     get_compounds_from_file,
 )
 from .smiles_availability import AvailabilityMatch, SmilesAvailability
-from .utils import wrap_standardizer_with_tilde_substitution
+from .utils import (
+    CacheInfo,
+    LRUCache,
+    map_in_threads,
+    wrap_standardizer_with_tilde_substitution,
+)
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -59,6 +81,10 @@ AVAILABILITY_METADATA = OrderedDict(
     ]
 )
 
+_MAX_LENGTH_FOR_INTERNING = 64
+
+_T = TypeVar("_T")
+
 
 def default_standardize_molecules(smiles: str) -> str:
     """Standardize molecules.
@@ -69,7 +95,7 @@ def default_standardize_molecules(smiles: str) -> str:
     Returns:
         standardized molecules.
     """
-    return standardize_molecules(
+    standardized = standardize_molecules(
         smiles,
         canonicalize=True,
         sanitize=True,
@@ -81,6 +107,72 @@ def default_standardize_molecules(smiles: str) -> str:
         enzyme_separator="|",
     )
 
+    # Short SMILES strings (the most frequent ones, such as solvents and
+    # reagents) are interned, for faster lookups in the available compounds.
+    if len(standardized) < _MAX_LENGTH_FOR_INTERNING:
+        standardized = sys.intern(standardized)
+    return standardized
+
+
+class _SourcesAttribute(Generic[_T]):
+    """
+    Attribute of IsAvailable determining its combiners: setting it recreates
+    them, and forgets the cached availabilities.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._attribute_name = "_" + name
+
+    @overload
+    def __get__(self, instance: None, owner: Type[Any]) -> "_SourcesAttribute[_T]": ...
+
+    @overload
+    def __get__(self, instance: "IsAvailable", owner: Type[Any]) -> _T: ...
+
+    def __get__(self, instance: Optional["IsAvailable"], owner: Type[Any]) -> Any:
+        if instance is None:
+            return self
+        return getattr(instance, self._attribute_name)
+
+    def __set__(self, instance: "IsAvailable", value: _T) -> None:
+        setattr(instance, self._attribute_name, value)
+        instance._on_sources_changed()
+
+
+class _DatabaseSources(MutableMapping[str, AvailabilityFromDatabase]):
+    """
+    Database sources of IsAvailable, by name: adding, replacing, or removing
+    any of them recreates the combiners of IsAvailable.
+    """
+
+    def __init__(
+        self,
+        is_available: "IsAvailable",
+        databases: Dict[str, AvailabilityFromDatabase],
+    ):
+        self._is_available = is_available
+        self._databases = databases
+
+    def __getitem__(self, key: str) -> AvailabilityFromDatabase:
+        return self._databases[key]
+
+    def __setitem__(self, key: str, value: AvailabilityFromDatabase) -> None:
+        self._databases[key] = value
+        self._is_available._on_sources_changed()
+
+    def __delitem__(self, key: str) -> None:
+        del self._databases[key]
+        self._is_available._on_sources_changed()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._databases)
+
+    def __len__(self) -> int:
+        return len(self._databases)
+
+    def __repr__(self) -> str:
+        return repr(self._databases)
+
 
 class IsAvailable:
     """
@@ -88,8 +180,30 @@ class IsAvailable:
 
     Combines different sources for availability and exclusion, mixing default
     (hard-coded) values, availability databases, and user-provided input.
+
+    The sources are combined once, and combined again when any of them (or the
+    standardization function) is replaced.
     """
 
+    standardization_function: _SourcesAttribute[Callable[[str], str]] = (
+        _SourcesAttribute()
+    )
+    are_materials_exclusive: _SourcesAttribute[bool] = _SourcesAttribute()
+    from_default_compounds: _SourcesAttribute[AvailabilityFromSmiles] = (
+        _SourcesAttribute()
+    )
+    from_compound_index: _SourcesAttribute[Optional[AvailabilityFromSmiles]] = (
+        _SourcesAttribute()
+    )
+    from_default_regexes: _SourcesAttribute[AvailabilityFromRegex] = _SourcesAttribute()
+    from_default_smarts: _SourcesAttribute[AvailabilityFromSmarts] = _SourcesAttribute()
+    from_user: _SourcesAttribute[AvailabilityFromSmiles] = _SourcesAttribute()
+    from_model: _SourcesAttribute[AvailabilityFromSmiles] = _SourcesAttribute()
+    excluded_compounds: _SourcesAttribute[AvailabilityFromSmiles] = _SourcesAttribute()
+    excluded_substructures: _SourcesAttribute[AvailabilityFromSmarts] = (
+        _SourcesAttribute()
+    )
+
     def __init__(
         self,
         pricing_threshold: int = 0,
@@ -100,6 +214,9 @@ class IsAvailable:
         are_materials_exclusive: bool = False,
         standardization_function: Callable[[str], str] = default_standardize_molecules,
         additional_compounds_filepath: Optional[Union[Path, str]] = None,
+        additional_compounds_index_filepath: Optional[Union[Path, str]] = None,
+        cache_size: int = 4096,
+        cache_ttl: Optional[float] = 3600,
     ) -> None:
         """
         Initialize the availability probing object.
@@ -117,9 +234,21 @@ class IsAvailable:
                 It handles multiple molecule separated with '.' as well as '~' fragment bonds.
             additional_compounds_filepath: path to compounds to add to the available ones
                 from a custom file source.
+            additional_compounds_index_filepath: path to a compound index
+                (see write_compound_index()) with standardized compounds to add
+                to the available ones. Contrary to the file above, the index is
+                memory-mapped instead of loaded, which suits large numbers of
+                compounds.
+            cache_size: number of SMILES strings for which to keep the
+                standardization, and of standardized SMILES strings for which
+                to keep the availability (and metadata), in memory. Zero
+                disables caching.
+            cache_ttl: time (in seconds) after which the cached availabilities
+                (and metadata) expire, as the content of the databases may
+                change. None for no expiry.
         """
         self.standardization_function = wrap_standardizer_with_tilde_substitution(
-            standardization_function
+            standardization_function, cache_size=cache_size
         )
         self.are_materials_exclusive = are_materials_exclusive
 
@@ -138,9 +267,16 @@ class IsAvailable:
             | common_biochemical_byproducts()
             | additional_compounds_from_filepath
         )
+        self.from_compound_index = None
+        if additional_compounds_index_filepath is not None:
+            self.from_compound_index = AvailabilityFromSmiles(
+                CompoundIndex(additional_compounds_index_filepath)
+            )
         self.from_default_regexes = AvailabilityFromRegex(default_available_regexes())
+        # The SMARTS-based sources share the parsed molecules
+        self._mol_cache = MolCache()
         self.from_default_smarts = AvailabilityFromSmarts(
-            default_available_smarts_patterns()
+            default_available_smarts_patterns(), mol_provider=self._mol_cache
         )
 
         # User and model available compounds
@@ -161,13 +297,78 @@ class IsAvailable:
             self._ensure_iterable(excluded)
         )
         self.excluded_substructures = AvailabilityFromSmarts(
-            self._ensure_iterable(avoid_substructure)
+            self._ensure_iterable(avoid_substructure), mol_provider=self._mol_cache
         )
 
         # Under which key the instance of SmilesAvailability will be stored in the
         # 'info' dict of AvailabilityMatch.
         self.key_for_source_instance = "smilesavailability_instance"
 
+        # Combiners for the default queries, created once instead of on every
+        # query, and recreated when replacing any of the sources above.
+        self._update_combiners()
+
+        # Caches for the availability and the metadata category, with the
+        # standardized SMILES strings as keys.
+        self._call_cache: LRUCache[str, bool] = LRUCache(
+            maxsize=cache_size, ttl=cache_ttl
+        )
+        self._metadata_cache: LRUCache[str, str] = LRUCache(
+            maxsize=cache_size, ttl=cache_ttl
+        )
+
+    def __copy__(self) -> "IsAvailable":
+        # Shallow copy, except for what depends on the sources: the sources of
+        # a copy may be replaced without affecting the original, and vice versa.
+        copied = self.__class__.__new__(self.__class__)
+        copied.__dict__.update(self.__dict__)
+        copied._from_database = _DatabaseSources(copied, dict(self._from_database))
+        copied._call_cache = LRUCache(
+            maxsize=self._call_cache.maxsize, ttl=self._call_cache.ttl
+        )
+        copied._metadata_cache = LRUCache(
+            maxsize=self._metadata_cache.maxsize, ttl=self._metadata_cache.ttl
+        )
+        return copied
+
+    def _update_combiners(self) -> None:
+        """Create the combiners for the default sources and exclusions."""
+        self._default_combiner = self._make_combiner(
+            sources=self._default_sources(),
+            excluded_sources=self._default_excluded_sources(),
+        )
+        # NOTE: same availability as the default combiner, but with the sources
+        # in the order determining the category of the metadata.
+        self._metadata_combiner = self._make_combiner(
+            sources=self._metadata_sources(),
+            excluded_sources=self._default_excluded_sources(),
+        )
+        # NOTE: used for batches, after the exclusions are applied separately.
+        self._non_database_combiner = self._make_combiner(
+            sources=self._default_sources(include_databases=False),
+            excluded_sources=[],
+        )
+        self._expandability_combiner = self._make_combiner(
+            sources=[
+                *self._default_compound_sources(),
+                self.from_default_regexes,
+                self.from_user,
+            ],
+            excluded_sources=[],
+        )
+
+    def _make_combiner(
+        self,
+        sources: Iterable[SmilesAvailability],
+        excluded_sources: Iterable[SmilesAvailability],
+    ) -> AvailabilityCombiner:
+        return AvailabilityCombiner(
+            sources=sources,
+            add_source_to_match_info_key=self.key_for_source_instance,
+            excluded_sources=excluded_sources,
+            standardizer=self.standardization_function,
+        )
+
     def _ensure_iterable(
         self, optional_iterable: Optional[Iterable[str]]
     ) -> Iterable[str]:
@@ -186,13 +387,25 @@ class IsAvailable:
         Returns:
             False if the SMILES string is not available, True otherwise.
         """
-        first_match = self._get_first_availability_match(smiles)
-        if first_match is None:
-            logger.debug(f'SMILES "{smiles}" is not available.')
+        standardized_smiles = self._standardize(smiles)
+        if standardized_smiles is None:
             return False
 
-        logger.debug(f'SMILES "{smiles}" is available: {first_match.details}.')
-        return True
+        is_available = self._call_cache.get(standardized_smiles)
+        if is_available is not None:
+            return is_available
+
+        first_match = self._get_first_availability_match_prestandardized(
+            standardized_smiles
+        )
+        is_available = first_match is not None
+        self._call_cache.put(standardized_smiles, is_available)
+
+        if first_match is None:
+            logger.debug(f'SMILES "{smiles}" is not available.')
+        else:
+            logger.debug(f'SMILES "{smiles}" is available: {first_match.details}.')
+        return is_available
 
     def get_availability_metadata(self, smiles: str) -> Dict:
         """Get availability metadata given a SMILES string.
@@ -203,16 +416,119 @@ class IsAvailable:
         Returns:
             metadata on availability.
         """
-
-        match = self._get_first_availability_match(smiles)
-        if match is None:
-            availability_metadata_key = "unavailable"
-        else:
-            source = match.info[self.key_for_source_instance]
-            availability_metadata_key = self._source_to_category(source)
+        standardized_smiles = self._standardize(smiles)
+        if standardized_smiles is None:
+            return AVAILABILITY_METADATA["unavailable"]
+
+        availability_metadata_key = self._metadata_cache.get(standardized_smiles)
+        if availability_metadata_key is None:
+            match = self._metadata_combiner._first_match_prestandardized(
+                standardized_smiles
+            )
+            if match is None:
+                availability_metadata_key = "unavailable"
+            else:
+                source = match.info[self.key_for_source_instance]
+                availability_metadata_key = self._source_to_category(source)
+            self._metadata_cache.put(standardized_smiles, availability_metadata_key)
 
         return AVAILABILITY_METADATA[availability_metadata_key]
 
+    def is_available_batch(
+        self, smiles_list: Iterable[str], max_workers: Optional[int] = None
+    ) -> List[bool]:
+        """
+        Inquire the availability of multiple SMILES strings.
+
+        Equivalent to calling the object on each SMILES string, except that
+        each database is queried only once, for all the SMILES strings that
+        were not found in the other sources. Also, the (unique) SMILES strings
+        are standardized in parallel threads.
+
+        Args:
+            smiles_list: SMILES strings for which the availability is needed.
+            max_workers: number of threads for the standardization. Defaults
+                to the number of CPUs.
+
+        Returns:
+            List of availabilities, in the same order as the given SMILES strings.
+        """
+        smiles_list = list(smiles_list)
+        unique_smiles = list(dict.fromkeys(smiles_list))
+        smiles_to_standardized = dict(
+            zip(
+                unique_smiles,
+                map_in_threads(
+                    self._standardize, unique_smiles, max_workers=max_workers
+                ),
+            )
+        )
+        standardized_smiles_list = [smiles_to_standardized[s] for s in smiles_list]
+
+        # Availability for the SMILES strings already known from the cache or
+        # from the sources other than the databases.
+        availabilities: Dict[str, bool] = {}
+        not_cached: List[str] = []
+        for smiles in dict.fromkeys(standardized_smiles_list):
+            if smiles is None:
+                continue
+            is_available = self._call_cache.get(smiles)
+            if is_available is None:
+                not_cached.append(smiles)
+            else:
+                availabilities[smiles] = is_available
+
+        excluded = self._default_combiner._is_excluded_batch(not_cached)
+        candidates: List[str] = []
+        for smiles, is_excluded in zip(not_cached, excluded):
+            if is_excluded:
+                availabilities[smiles] = False
+            else:
+                candidates.append(smiles)
+
+        to_query_in_databases: List[str] = []
+        for smiles, is_available in zip(
+            candidates, self._non_database_combiner._is_available_batch(candidates)
+        ):
+            if is_available:
+                availabilities[smiles] = True
+            else:
+                to_query_in_databases.append(smiles)
+
+        # One single query per database for the remaining ones
+        database_availabilities = (
+            [False] * len(to_query_in_databases)
+            if self.are_materials_exclusive
+            else _any_source_batch(self.from_database.values(), to_query_in_databases)
+        )
+        for smiles, is_available in zip(to_query_in_databases, database_availabilities):
+            availabilities[smiles] = is_available
+
+        for smiles, is_available in availabilities.items():
+            self._call_cache.put(smiles, is_available)
+
+        return [
+            smiles is not None and availabilities[smiles]
+            for smiles in standardized_smiles_list
+        ]
+
+    def clear_cache(self) -> None:
+        """Clear the cached availabilities and metadata."""
+        self._call_cache.clear()
+        self._metadata_cache.clear()
+
+    def cache_info(self) -> Dict[str, CacheInfo]:
+        """Get the statistics of the availability and metadata caches."""
+        return {
+            "availability": self._call_cache.info(),
+            "metadata": self._metadata_cache.info(),
+        }
+
+    def _standardize(self, smiles: str) -> Optional[str]:
+        """Standardize a SMILES string (None if the standardization fails)."""
+        # NOTE: the default combiner standardizes with standardization_function.
+        return self._default_combiner._standardize(smiles)
+
     def is_expandable(self, smiles: str) -> bool:
         """
         Get expandability given a SMILES.
@@ -227,17 +543,8 @@ class IsAvailable:
         # Note: this does the same thing as the original implementation - maybe,
         # it will be necessary to review this behavior at some point. For instance,
         # it does not consider the default SMARTS strings.
-        sources = [
-            self.from_default_compounds,
-            self.from_default_regexes,
-            self.from_user,
-        ]
-        match = self._get_first_availability_match(
-            smiles, sources=sources, excluded_sources=[]
-        )
-
         # if there is no match, it means that the molecule is expandable.
-        return match is None
+        return not self._expandability_combiner.is_available(smiles)
 
     def _get_first_availability_match(
         self,
@@ -255,30 +562,85 @@ class IsAvailable:
             excluded_sources: sources to exclude. Defaults to the excluded compounds
                 and substructures.
         """
+        standardized_smiles = self._standardize(smiles)
+        if standardized_smiles is None:
+            return None
+
+        return self._get_first_availability_match_prestandardized(
+            standardized_smiles, sources=sources, excluded_sources=excluded_sources
+        )
+
+    def _get_first_availability_match_prestandardized(
+        self,
+        smiles: str,
+        sources: Optional[Iterable[SmilesAvailability]] = None,
+        excluded_sources: Optional[Iterable[SmilesAvailability]] = None,
+    ) -> Optional[AvailabilityMatch]:
+        """
+        Same as _get_first_availability_match(), for an already standardized
+        SMILES string.
+        """
+        if sources is None and excluded_sources is None:
+            return self._default_combiner._first_match_prestandardized(smiles)
+
         if sources is None:
-            sources = [
-                self.from_default_compounds,
-                self.from_default_regexes,
-                self.from_default_smarts,
-                self.from_user,
-            ]
-            if not self.are_materials_exclusive:
-                sources.append(self.from_model)
-                sources.extend(self.from_database.values())
+            sources = self._default_sources()
         if excluded_sources is None:
-            excluded_sources = [
-                self.excluded_compounds,
-                self.excluded_substructures,
-            ]
+            excluded_sources = self._default_excluded_sources()
 
-        availability_combiner = AvailabilityCombiner(
-            sources=sources,
-            add_source_to_match_info_key=self.key_for_source_instance,
-            excluded_sources=excluded_sources,
-            standardizer=self.standardization_function,
+        availability_combiner = self._make_combiner(
+            sources=sources, excluded_sources=excluded_sources
         )
-
-        return availability_combiner.first_match(smiles)
+        return availability_combiner._first_match_prestandardized(smiles)
+
+    def _default_sources(
+        self, include_databases: bool = True
+    ) -> List[SmilesAvailability]:
+        """Get the availability sources to consider by default."""
+        # NOTE: the sources are queried in order until a first match is found;
+        # they are therefore ordered from the cheapest to the most expensive.
+        sources: List[SmilesAvailability] = [
+            *self._default_compound_sources(),
+            self.from_user,
+        ]
+        if not self.are_materials_exclusive:
+            sources.append(self.from_model)
+        sources.append(self.from_default_regexes)
+        if not self.are_materials_exclusive and include_databases:
+            sources.extend(self.from_database.values())
+        sources.append(self.from_default_smarts)
+        return sources
+
+    def _metadata_sources(self) -> List[SmilesAvailability]:
+        """
+        Get the default sources, in the order determining the category of the
+        metadata: a compound available by default is reported as such, even if
+        it is also available from the user, the model, or a database.
+        """
+        sources: List[SmilesAvailability] = [
+            *self._default_compound_sources(),
+            self.from_default_regexes,
+            self.from_default_smarts,
+            self.from_user,
+        ]
+        if not self.are_materials_exclusive:
+            sources.append(self.from_model)
+            sources.extend(self.from_database.values())
+        return sources
+
+    def _default_compound_sources(self) -> List[SmilesAvailability]:
+        """Get the sources for the compounds available by default."""
+        sources: List[SmilesAvailability] = [self.from_default_compounds]
+        if self.from_compound_index is not None:
+            sources.append(self.from_compound_index)
+        return sources
+
+    def _default_excluded_sources(self) -> List[SmilesAvailability]:
+        """Get the exclusion sources to consider by default."""
+        return [
+            self.excluded_compounds,
+            self.excluded_substructures,
+        ]
 
     def _source_to_category(self, source: SmilesAvailability) -> str:
         """
@@ -289,7 +651,7 @@ class IsAvailable:
         if any(
             source is s
             for s in [
-                self.from_default_compounds,
+                *self._default_compound_sources(),
                 self.from_default_regexes,
                 self.from_default_smarts,
                 self.from_user,
@@ -306,6 +668,26 @@ class IsAvailable:
 
         raise ValueError(f'Cannot get category for source "{source}"')
 
+    @property
+    def from_database(self) -> MutableMapping[str, AvailabilityFromDatabase]:
+        """Database sources, by name."""
+        return self._from_database
+
+    @from_database.setter
+    def from_database(
+        self, value: MutableMapping[str, AvailabilityFromDatabase]
+    ) -> None:
+        self._from_database = _DatabaseSources(self, dict(value))
+        self._on_sources_changed()
+
+    def _on_sources_changed(self) -> None:
+        """Recreate the combiners, and forget the previous availabilities."""
+        if "_call_cache" not in vars(self):
+            # Still in __init__, which creates the combiners at the end
+            return
+        self._update_combiners()
+        self.clear_cache()
+
     @property
     def pricing_threshold(self) -> int:
         """
@@ -321,3 +703,4 @@ class IsAvailable:
         self._pricing_threshold = value
         for database in self.from_database.values():
             database.pricing_threshold = self._pricing_threshold
+        self.clear_cache()
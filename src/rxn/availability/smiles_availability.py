@@ -1,14 +1,16 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, Iterator, Optional
+from typing import Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Optional
 
 from attr import Factory, define
 
+from .utils import cache_standardizer
+
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
-@define
+@define(slots=True)
 class AvailabilityMatch:
     """
     Class holding the information about a match when querying the availability
@@ -31,17 +33,49 @@ class SmilesAvailability(ABC):
     The base class provides the public functions is_available(), first_match(), and
     find_matches(), which are to be called by users. For derived classes, it is
     sufficient to implement the protected function _find_matches().
+
+    Attributes:
+        cost: relative cost of a query, from 1 (set lookup) to 4 (substructure
+            matching). Used to evaluate the cheapest sources first where the
+            order does not matter. Derived classes are assumed to be expensive
+            unless they specify otherwise.
     """
 
-    def __init__(self, standardizer: Optional[Callable[[str], str]] = None):
+    cost: ClassVar[int] = 4
+
+    # NOTE: no instance dictionary for this class and its derived classes;
+    # each of them lists its own attributes. Weak references remain supported.
+    __slots__ = ("_standardizer", "standardizer_cache_size", "__weakref__")
+
+    def __init__(
+        self,
+        standardizer: Optional[Callable[[str], str]] = None,
+        standardizer_cache_size: int = 0,
+    ):
         """
         Args:
             standardizer: function to call for standardizing SMILES strings
                 before the availability check (typically: canonicalization).
                 Defaults to no modification of the SMILES strings.
+            standardizer_cache_size: if positive, number of standardized SMILES
+                strings to keep in memory, for the repeated queries. Defaults
+                to no caching.
         """
+        self.standardizer_cache_size = standardizer_cache_size
         self.standardizer = standardizer
 
+    @property
+    def standardizer(self) -> Optional[Callable[[str], str]]:
+        return self._standardizer
+
+    @standardizer.setter
+    def standardizer(self, standardizer: Optional[Callable[[str], str]]) -> None:
+        if standardizer is not None and self.standardizer_cache_size > 0:
+            standardizer = cache_standardizer(
+                standardizer, maxsize=self.standardizer_cache_size
+            )
+        self._standardizer = standardizer
+
     def __call__(self, smiles: str) -> bool:
         """
         Whether the given SMILES string is available.
@@ -53,9 +87,56 @@ class SmilesAvailability(ABC):
     def is_available(self, smiles: str) -> bool:
         """Whether the given SMILES string is available."""
 
-        # We use any() so that the function stops as soon as a source is
-        # obtained. This avoids iterating to the end unnecessarily.
-        return any(True for _ in self.find_matches(smiles))
+        if self._standardizer is not None:
+            if self._pre_standardization_check(smiles) is not None:
+                return True
+
+            standardized_smiles = self._standardize(smiles)
+            if standardized_smiles is None:
+                return False
+            smiles = standardized_smiles
+
+        return self._is_available(smiles)
+
+    def is_available_batch(self, smiles_list: Iterable[str]) -> List[bool]:
+        """
+        Whether the given SMILES strings are available.
+
+        Equivalent to calling is_available() on each of them, except that
+        derived classes may share work between the SMILES strings (such as
+        parsing the molecules only once).
+
+        Args:
+            smiles_list: SMILES strings to get the availability for.
+
+        Returns:
+            List of availabilities, in the same order as the given SMILES strings.
+        """
+        availabilities: List[bool] = []
+        # Indices (in availabilities) and standardized SMILES strings still to check
+        indices: List[int] = []
+        to_check: List[str] = []
+
+        has_standardizer = self._standardizer is not None
+        for smiles in smiles_list:
+            if has_standardizer:
+                if self._pre_standardization_check(smiles) is not None:
+                    availabilities.append(True)
+                    continue
+
+                standardized_smiles = self._standardize(smiles)
+                if standardized_smiles is None:
+                    availabilities.append(False)
+                    continue
+                smiles = standardized_smiles
+
+            indices.append(len(availabilities))
+            availabilities.append(False)
+            to_check.append(smiles)
+
+        for index, is_available in zip(indices, self._is_available_batch(to_check)):
+            availabilities[index] = is_available
+        return availabilities
 
     def first_match(self, smiles: str) -> Optional[AvailabilityMatch]:
         """Get the first source match for the given SMILES string (None if no
@@ -78,15 +159,87 @@ class SmilesAvailability(ABC):
             Iterator/Generator over matches for the given SMILES string.
         """
 
-        if self.standardizer is not None:
-            try:
-                smiles = self.standardizer(smiles)
-            except Exception as e:
-                logger.warning(f'Error when standardizing SMILES "{smiles}": {e}')
+        if self._standardizer is not None:
+            match = self._pre_standardization_check(smiles)
+            if match is not None:
+                yield match
                 return
 
+            standardized_smiles = self._standardize(smiles)
+            if standardized_smiles is None:
+                return
+            smiles = standardized_smiles
+
         yield from self._find_matches(smiles)
 
+    def _standardize(self, smiles: str) -> Optional[str]:
+        """
+        Standardize a SMILES string with the standardizer, if any.
+
+        Returns:
+            The standardized SMILES string, or None if the standardization fails.
+        """
+        standardizer = self._standardizer
+        if standardizer is None:
+            return smiles
+        try:
+            return standardizer(smiles)
+        except Exception as e:
+            logger.warning(f'Error when standardizing SMILES "{smiles}": {e}')
+            return None
+
+    def _pre_standardization_check(self, smiles: str) -> Optional[AvailabilityMatch]:
+        """
+        Protected function to obtain a match without standardizing the SMILES string.
+
+        This function is called from the public find_matches() function before
+        the (usually expensive) standardization. Derived classes can override it
+        for conclusive checks on the raw SMILES string; if a match is returned,
+        it is the only one and the standardization is skipped.
+
+        Args:
+            smiles: SMILES string to get the match for (not standardized).
+
+        Returns:
+            The match, or None if standardizing the SMILES string is necessary.
+        """
+        return None
+
+    def _is_available(self, smiles: str) -> bool:
+        """
+        Protected function to determine whether a SMILES string is available.
+
+        This function is called from the public is_available() function, on an
+        already standardized SMILES string. Derived classes can override it to
+        answer without creating any AvailabilityMatch; by default, it relies on
+        _find_matches() and stops at the first match.
+
+        Args:
+            smiles: SMILES string to get the availability for (already standardized).
+        """
+        return next(self._find_matches(smiles), None) is not None
+
+    def _is_available_batch(self, smiles_list: List[str]) -> List[bool]:
+        """
+        Protected function to determine the availability of multiple SMILES strings.
+
+        This function is called from the public is_available_batch() function,
+        on already standardized SMILES strings. By default, it calls
+        _is_available() on each of them.
+
+        Args:
+            smiles_list: SMILES strings to get the availability for (already
+                standardized).
+        """
+        return [self._is_available(smiles) for smiles in smiles_list]
+
+    def _first_match_prestandardized(self, smiles: str) -> Optional[AvailabilityMatch]:
+        """
+        Same as first_match(), for a SMILES string that was already standardized
+        by the caller. This avoids standardizing the same SMILES string twice.
+        """
+        return next(self._find_matches(smiles), None)
+
     @abstractmethod
     def _find_matches(self, smiles: str) -> Iterator[AvailabilityMatch]:
         """
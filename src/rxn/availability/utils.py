@@ -1,8 +1,184 @@
-from typing import Callable
+import copy
+import functools
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache, similar to the ones of functools.lru_cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe cache discarding the least recently used entries first.
+
+    Contrary to functools.lru_cache, the cache is not bound to a function,
+    which allows for storing values computed elsewhere and for choosing the key.
+    Optionally, the entries expire after a given time.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: maximal number of entries in the cache. Zero disables caching.
+            ttl: time to live of the entries, in seconds. Defaults to no expiry.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Values, together with the (monotonic) time at which they expire
+        self._data: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The lock cannot be pickled (or copied); a new one is created instead.
+        with self._lock:
+            state = self.__dict__.copy()
+            state["_data"] = self._data.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "LRUCache[K, V]":
+        copied = self.__class__.__new__(self.__class__)
+        copied.__setstate__(copy.deepcopy(self.__getstate__(), memo))
+        return copied
+
+    def get(self, key: K) -> Optional[V]:
+        """Get the cached value for the given key (None if not cached)."""
+        with self._lock:
+            try:
+                value, expiry = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            if expiry < time.monotonic():
+                del self._data[key]
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store a value in the cache, discarding the oldest entry if needed."""
+        if self.maxsize <= 0:
+            return
+        expiry = math.inf if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expiry)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        """Get the cache statistics."""
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.maxsize,
+                currsize=len(self._data),
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def map_in_threads(
+    function: Callable[[T], V], items: Iterable[T], max_workers: Optional[int] = None
+) -> List[V]:
+    """
+    Apply a function to multiple items, in parallel threads.
+
+    This is beneficial for functions releasing the GIL, such as the RDKit
+    functions used for parsing and canonicalizing SMILES strings.
+
+    Args:
+        function: function to apply.
+        items: items to apply the function to.
+        max_workers: number of threads. Defaults to the number of CPUs. With
+            one single worker, the function is called sequentially.
+
+    Returns:
+        The function results, in the same order as the items.
+    """
+    items = list(items)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(items))
+
+    if max_workers <= 1:
+        return [function(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, items))
+
+
+def cache_standardizer(
+    smiles_standardizer: Callable[[str], str], maxsize: int
+) -> Callable[[str], str]:
+    """
+    Wrap a SMILES standardizer to keep the most recent results in memory.
+
+    This is useful when the same SMILES strings are standardized repeatedly,
+    as the standardization (typically: canonicalization) is expensive. The
+    standardized SMILES strings are interned, as they are likely to be looked
+    up in sets of available compounds.
+
+    Args:
+        smiles_standardizer: standardizer to wrap.
+        maxsize: number of standardized SMILES strings to keep in memory.
+    """
+
+    @functools.lru_cache(maxsize=maxsize)
+    def cached_standardizer(smiles: str) -> str:
+        return sys.intern(smiles_standardizer(smiles))
+
+    return cached_standardizer
 
 
 def wrap_standardizer_with_tilde_substitution(
-    smiles_standardizer: Callable[[str], str]
+    smiles_standardizer: Callable[[str], str],
+    cache_size: int = 0,
 ) -> Callable[[str], str]:
     """
     Wrap a SMILES standardizer to make it replace tildes with dots.
@@ -11,10 +187,20 @@ def wrap_standardizer_with_tilde_substitution(
     fragment bond, it is necessary to remain compatible with it. This function
     ensures this compatibility by replacing tildes with dots as a first step
     for the SMILES standardization.
+
+    Args:
+        smiles_standardizer: standardizer to wrap.
+        cache_size: if positive, number of standardized SMILES strings to keep
+            in memory (see cache_standardizer()). Defaults to no caching.
     """
 
     def wrapped_standardizer(smiles: str) -> str:
-        smiles = smiles.replace("~", ".")
+        # NOTE: most SMILES strings do not contain any tilde; for the others,
+        # str.replace is faster than str.translate.
+        if "~" in smiles:
+            smiles = smiles.replace("~", ".")
         return smiles_standardizer(smiles)
 
+    if cache_size > 0:
+        return cache_standardizer(wrapped_standardizer, maxsize=cache_size)
     return wrapped_standardizer
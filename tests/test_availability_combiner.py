@@ -1,8 +1,10 @@
-from typing import Callable, List
+import pickle
+from typing import Callable, Iterator, List
 
 from rxn.availability.availability_combiner import AvailabilityCombiner
 from rxn.availability.availability_from_smarts import AvailabilityFromSmarts
 from rxn.availability.availability_from_smiles import AvailabilityFromSmiles
+from rxn.availability.smiles_availability import AvailabilityMatch
 
 
 def test_availability_combiner():
@@ -21,6 +23,9 @@ def test_availability_combiner():
         excluded_sources=excluded,
     )
 
+    # exclusions are sorted from the cheapest to the most expensive ones
+    assert combined.excluded_sources == [excluded[2], excluded[0], excluded[1]]
+
     # simple positive checks
     assert combined.is_available("CCCCCCO")
     assert combined.is_available("CCCC")
@@ -30,9 +35,114 @@ def test_availability_combiner():
     assert not combined.is_available("CO")
     assert not combined.is_available("C")
 
+    # same availabilities for batches
+    smiles_list = ["CCCCCCO", "CCCC", "CCC", "CO", "C", "[Na+].[Cl-]"]
+    assert combined.is_available_batch(smiles_list) == [
+        True,
+        True,
+        False,
+        False,
+        False,
+        False,
+    ]
+
     # getting the information on which class the availability comes from
     combined.add_source_to_match_info_key = "dummy_key"
     matches = list(combined.find_matches("CCO"))
     assert len(matches) == 2
     assert matches[0].info["dummy_key"] is exact_smiles_availability
     assert matches[1].info["dummy_key"] is smarts_availability
+
+
+def test_availability_combiner_reassign_sources():
+    combined = AvailabilityCombiner(sources=[AvailabilityFromSmiles(["CCO"])])
+    assert combined.is_available("CCO")
+    assert not combined.is_available("CCCC")
+
+    combined.sources = [AvailabilityFromSmiles(["CCCC"])]
+    combined.excluded_sources = [lambda x: x == "CCO"]
+    assert not combined.is_available("CCO")
+    assert combined.is_available("CCCC")
+
+    combined.excluded_sources = []
+    assert combined.is_available("CCCC")
+    assert not combined.is_available("CCO")
+
+
+def test_availability_combiner_parses_molecules_once():
+    combined = AvailabilityCombiner(
+        sources=[AvailabilityFromSmarts(["[O;H1]"]), AvailabilityFromSmarts(["[Br]"])],
+        excluded_sources=[AvailabilityFromSmarts(["[Na+]"])],
+    )
+
+    assert combined.is_available("CCBr")
+    assert not combined.is_available("CCCl")
+
+    # One parsing per query, shared by the three SMARTS-based sources
+    assert combined._mol_cache._parse.cache_info().misses == 2
+    assert combined._mol_cache._parse.cache_info().hits == 4
+
+
+def test_availability_combiner_with_standardized_sources():
+    # Sources with a standardizer of their own are called as such
+    combined = AvailabilityCombiner(
+        sources=[
+            AvailabilityFromSmiles(["CCCC"]),
+            AvailabilityFromSmiles(["CCO"], standardizer=lambda s: s.upper()),
+            AvailabilityFromSmarts(
+                ["[Br]"], standardizer=lambda s: s.replace("~", ".")
+            ),
+        ],
+        excluded_sources=[AvailabilityFromSmiles(["CCN"], standardizer=str.upper)],
+    )
+
+    assert combined.is_available("CCCC")
+    assert combined.is_available("cco")
+    assert combined.is_available("CC~Br")
+    assert not combined.is_available("ccn")
+    assert not combined.is_available("cccc")
+
+
+def test_availability_combiner_pickle():
+    combined = AvailabilityCombiner(
+        sources=[AvailabilityFromSmiles(["CCCC"]), AvailabilityFromSmarts(["[Br]"])],
+        excluded_sources=[
+            AvailabilityFromSmiles(["O"]),
+            AvailabilityFromSmarts(["[Na+]"]),
+        ],
+        add_source_to_match_info_key="dummy_key",
+    )
+
+    unpickled = pickle.loads(pickle.dumps(combined))
+
+    assert unpickled.add_source_to_match_info_key == "dummy_key"
+    assert unpickled.is_available("CCCC")
+    assert unpickled.is_available("CCBr")
+    assert not unpickled.is_available("O")
+    assert not unpickled.is_available("[Na+].CCBr")
+    assert not unpickled.is_available("CCC")
+    assert unpickled.is_available_batch(["CCCC", "O", "CCC"]) == [True, False, False]
+
+
+def test_availability_combiner_with_derived_sources():
+    class CaseInsensitiveAvailabilityFromSmiles(AvailabilityFromSmiles):
+        def _is_available(self, smiles: str) -> bool:
+            return super()._is_available(smiles.upper())
+
+        def _find_matches(self, smiles: str) -> Iterator[AvailabilityMatch]:
+            return super()._find_matches(smiles.upper())
+
+    class BromineAvailabilityFromSmarts(AvailabilityFromSmarts):
+        def _is_available(self, smiles: str) -> bool:
+            return "Br" in smiles
+
+    combined = AvailabilityCombiner(
+        sources=[
+            CaseInsensitiveAvailabilityFromSmiles(["CCO"]),
+            BromineAvailabilityFromSmarts([]),
+        ]
+    )
+
+    assert combined.is_available("cco")
+    assert combined.first_match("cco") is not None
+    assert combined.is_available("CCBr")
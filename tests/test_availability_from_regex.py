@@ -1,5 +1,7 @@
 import re
+import sys
 
+import pytest
 from rxn.chemutils.conversion import canonicalize_smiles
 
 from rxn.availability.availability_from_regex import AvailabilityFromRegex
@@ -21,7 +23,116 @@ def test_availability_from_regex():
     # possible to have several matches
     assert len(list(availability_from_regex.find_matches("[Na+].CCCCc2ccccc2CC"))) == 2
 
+    # plain strings are looked for without regex search
+    assert availability_from_regex._literals == ["[Na+]", "CCc2cc"]
+
     # If a standardizer is given: will standardize before trying to match.
     # In the case below, no match anymore because the number will be 1 after canonicalization.
     availability_from_regex.standardizer = canonicalize_smiles
     assert not availability_from_regex("CCc2ccccc2")
+
+
+def test_availability_from_regex_with_literals_and_regexes():
+    regexes = [
+        re.compile(r"^\[K\+\]$"),
+        re.compile(re.escape("[Na+]")),
+        re.compile(r"Br|I"),
+        re.compile(re.escape("C.C")),
+    ]
+
+    availability_from_regex = AvailabilityFromRegex(regexes=regexes)
+    assert availability_from_regex._literals == ["[Na+]", "C.C"]
+
+    assert availability_from_regex("[K+]")
+    assert not availability_from_regex("[K+].[Cl-]")
+    assert availability_from_regex("CC.CC")
+    assert not availability_from_regex("CCC")
+    assert availability_from_regex("CCI")
+
+    # The matches are in the original order
+    assert [
+        match.details for match in availability_from_regex.find_matches("[Na+].CC.CBr")
+    ] == [
+        'Matching regex "\\[Na\\+\\]".',
+        'Matching regex "Br|I".',
+        'Matching regex "C\\.C".',
+    ]
+
+
+def test_availability_from_regex_with_different_flags():
+    # Different flags: each one applies to its own regex only
+    regexes = [
+        re.compile("cl", re.IGNORECASE),
+        re.compile("^Br$", re.MULTILINE),
+        re.compile(re.escape("[Na+]")),
+    ]
+
+    availability_from_regex = AvailabilityFromRegex(regexes=regexes)
+    assert availability_from_regex._union is not None
+
+    assert availability_from_regex("C[Cl]")
+    assert availability_from_regex("C\nBr")
+    assert not availability_from_regex("CBR")
+    assert not availability_from_regex("[NA+]")
+
+
+def test_availability_from_regex_with_incompatible_regexes():
+    # Backreferences and verbose regexes: the regexes cannot be merged into
+    # one single pattern, but the availability is still correct.
+    regexes = [
+        re.compile("cl", re.IGNORECASE),
+        re.compile(r"(CC)\1"),
+    ]
+
+    availability_from_regex = AvailabilityFromRegex(regexes=regexes)
+    assert availability_from_regex._union is None
+
+    assert availability_from_regex("C[Cl]")
+    assert availability_from_regex("OCCCCO")
+    assert not availability_from_regex("OCCCO")
+
+    availability_from_regex = AvailabilityFromRegex(
+        regexes=[re.compile("N # nitrogen", re.VERBOSE), re.compile("S", re.VERBOSE)]
+    )
+    assert availability_from_regex._union is None
+    assert availability_from_regex("CN")
+    assert not availability_from_regex("CO")
+
+
+@pytest.mark.parametrize("engine", ["re", "hyperscan"])
+def test_availability_from_regex_engines(engine: str):
+    if engine == "hyperscan":
+        pytest.importorskip("hyperscan")
+    regexes = [
+        re.compile(re.escape("[Na+]")),
+        re.compile("cl", re.IGNORECASE),
+    ]
+
+    availability_from_regex = AvailabilityFromRegex(regexes=regexes, engine=engine)
+    assert (availability_from_regex._hyperscan_database is not None) == (
+        engine == "hyperscan"
+    )
+
+    assert availability_from_regex("[Na+].[Cl-]")
+    assert availability_from_regex("CCl")
+    assert not availability_from_regex("CCBr")
+    assert [
+        match.details for match in availability_from_regex.find_matches("[Cl-].[Na+]")
+    ] == ['Matching regex "\\[Na\\+\\]".', 'Matching regex "cl".']
+
+
+def test_availability_from_regex_hyperscan_fallback(monkeypatch):
+    # Without Hyperscan, the re module is used instead
+    monkeypatch.setitem(sys.modules, "hyperscan", None)
+    availability_from_regex = AvailabilityFromRegex(
+        regexes=[re.compile("cl", re.IGNORECASE)], engine="hyperscan"
+    )
+
+    assert availability_from_regex._hyperscan_database is None
+    assert availability_from_regex("CCl")
+    assert not availability_from_regex("CCBr")
+
+
+def test_availability_from_regex_invalid_engine():
+    with pytest.raises(ValueError):
+        AvailabilityFromRegex(regexes=[], engine="pcre")
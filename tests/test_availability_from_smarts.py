@@ -1,4 +1,10 @@
-from rxn.availability.availability_from_smarts import AvailabilityFromSmarts
+import pickle
+
+import pytest
+
+from rxn.availability import IsAvailable
+from rxn.availability.availability_from_smarts import AvailabilityFromSmarts, MolCache
+from rxn.availability.defaults import default_available_smarts_patterns
 
 
 def test_is_available_from_smarts():
@@ -39,3 +45,149 @@ def test_availability_matches_from_smarts():
         'Matching SMARTS "[O;D2]C".',
         'Matching SMARTS "[F,Cl,Br,I]".',
     ]
+
+
+def test_availability_from_smarts_with_mol_cache():
+    mol_cache = MolCache(maxsize=8)
+    smarts = ["[O;D2]C", "[F,Cl,Br,I]"]
+    availability_from_smarts = AvailabilityFromSmarts(
+        smarts=smarts, mol_provider=mol_cache
+    )
+    other_availability_from_smarts = AvailabilityFromSmarts(
+        smarts=["[O;H1]"], mol_provider=mol_cache
+    )
+
+    assert availability_from_smarts("COCCCBr")
+    assert not other_availability_from_smarts("COCCCBr")
+    assert not availability_from_smarts("invalid")
+    assert len(list(availability_from_smarts.find_matches("COCCCBr"))) == 2
+
+    # The molecule was parsed only once for the three queries
+    assert mol_cache._parse.cache_info().misses == 2
+    assert mol_cache._parse.cache_info().hits == 2
+
+
+def test_availability_from_default_smarts():
+    # The default SMARTS patterns are combined into one recursive SMARTS;
+    # the availability must be the same as when matching them one by one.
+    availability_from_smarts = AvailabilityFromSmarts(
+        smarts=default_available_smarts_patterns()
+    )
+    smiles_list = [
+        "S1[Fe]S[Fe]1",
+        "CC(C)(COP(=O)(O)OP(=O)(O)OC[C@H]1O[C@@H](n2cnc3c(N)ncnc32)[C@H](O)"
+        "[C@@H]1OP(=O)(O)O)[C@@H](O)C(=O)NCCC(=O)NCCS",
+        "CCO",
+        "c1ccccc1",
+        "OC1COC(O)C1O",
+    ]
+
+    for smiles in smiles_list:
+        matches = list(availability_from_smarts.find_matches(smiles))
+        assert availability_from_smarts(smiles) == (len(matches) > 0)
+    assert availability_from_smarts("S1[Fe]S[Fe]1")
+    assert not availability_from_smarts("CCO")
+
+
+def test_availability_from_smarts_batch():
+    smiles_list = ["COC", "OCCBr", "CCO", "invalid", "NON", "C1COCC1"]
+
+    for smarts in [["[O;D2]C", "[F,Cl,Br,I]"], ["[O;D2]C.[Br]", "[F,Cl,Br,I]"]]:
+        # The second list of patterns cannot be combined into one
+        availability_from_smarts = AvailabilityFromSmarts(smarts=smarts)
+        assert availability_from_smarts.is_available_batch(smiles_list) == [
+            availability_from_smarts(smiles) for smiles in smiles_list
+        ]
+
+
+def test_availability_from_smarts_pattern_order():
+    # Disconnected patterns: not combined, checked one by one
+    smarts = ["[Na+]", "[Cl].[Cl]", "c1ccccc1.O"]
+    availability_from_smarts = AvailabilityFromSmarts(smarts=smarts)
+
+    # The largest patterns are checked first, but the matches are in the
+    # original order
+    sizes = [p.GetNumAtoms() for p in availability_from_smarts._check_patterns]
+    assert sizes == [7, 2, 1]
+    assert [
+        match.details
+        for match in availability_from_smarts.find_matches("[Na+].Oc1ccccc1")
+    ] == ['Matching SMARTS "[Na+]".', 'Matching SMARTS "c1ccccc1.O".']
+    assert availability_from_smarts("ClCCCl")
+    assert not availability_from_smarts("CCCl")
+
+
+def test_availability_from_smarts_pickle():
+    smarts = ["[O;D2]C", "[F,Cl,Br,I]"]
+    availability_from_smarts = AvailabilityFromSmarts(
+        smarts=smarts, mol_provider=MolCache(maxsize=8)
+    )
+    assert availability_from_smarts("COC")
+
+    unpickled = pickle.loads(pickle.dumps(availability_from_smarts))
+
+    assert [s for _, s in unpickled.available_smarts] == smarts
+    assert unpickled("COC")
+    assert unpickled("CBr")
+    assert not unpickled("CCO")
+    # The cache of molecules is not pickled: only the molecules above
+    assert isinstance(unpickled.mol_provider, MolCache)
+    assert unpickled.mol_provider._parse.cache_info().currsize == 3
+    # The compiled patterns are shared within the same process
+    assert (
+        unpickled.available_smarts[0][0]
+        is availability_from_smarts.available_smarts[0][0]
+    )
+
+
+def test_availability_from_smarts_with_chirality():
+    # The chirality is considered only for the patterns specifying it
+    smarts = ["[C@H](F)(Cl)Br", "[Na+]"]
+    availability_from_smarts = AvailabilityFromSmarts(smarts=smarts)
+
+    assert availability_from_smarts("F[C@@H](Cl)Br")
+    assert not availability_from_smarts("F[C@H](Cl)Br")
+    assert not availability_from_smarts("FC(Cl)Br")
+    assert availability_from_smarts("[Na+].F[C@H](Cl)Br")
+    assert len(list(availability_from_smarts.find_matches("F[C@H](Cl)Br"))) == 0
+
+    availability_from_smarts = AvailabilityFromSmarts(smarts=["C(F)(Cl)Br", "[Na+]"])
+    assert availability_from_smarts("F[C@H](Cl)Br")
+    assert availability_from_smarts("FC(Cl)Br")
+
+
+def test_availability_from_smarts_without_patterns():
+    mol_cache = MolCache(maxsize=8)
+    availability_from_smarts = AvailabilityFromSmarts(smarts=[], mol_provider=mol_cache)
+
+    assert not availability_from_smarts("CCO")
+    assert availability_from_smarts.is_available_batch(["CCO", "CCN"]) == [False, False]
+    assert list(availability_from_smarts.find_matches("CCO")) == []
+
+    # The molecules were not even parsed
+    assert mol_cache._parse.cache_info().misses == 0
+
+
+def test_availability_from_smarts_match_indices():
+    smarts = ["[O;D2]C", "[Na+]", "[F,Cl,Br,I]"]
+    availability_from_smarts = AvailabilityFromSmarts(smarts=smarts)
+
+    assert availability_from_smarts.find_match_indices("COCCCBr") == [0, 2]
+    assert availability_from_smarts.find_match_indices("CCO") == []
+    assert availability_from_smarts.find_match_indices("invalid") == []
+    assert [
+        availability_from_smarts.match_details[i]
+        for i in availability_from_smarts.find_match_indices("COCCCBr")
+    ] == [match.details for match in availability_from_smarts.find_matches("COCCCBr")]
+
+    # With standardization
+    availability_from_smarts.standardizer = lambda s: s.replace("~", ".")
+    assert availability_from_smarts.find_match_indices("[Na+]~COC") == [0, 1]
+
+
+def test_availability_from_invalid_smarts():
+    with pytest.raises(ValueError, match="Invalid SMARTS"):
+        AvailabilityFromSmarts(smarts=["[O;D2]C", "[invalid"])
+
+    with pytest.raises(ValueError, match="Invalid SMARTS"):
+        IsAvailable(avoid_substructure=["[invalid"])
@@ -1,3 +1,8 @@
+import weakref
+from typing import Iterator, List
+
+import attr
+import pytest
 from rxn.chemutils.conversion import canonicalize_smiles
 
 from rxn.availability.availability_from_smiles import AvailabilityFromSmiles
@@ -21,3 +26,116 @@ def test_availability_from_smiles():
     assert availability_from_smiles("OCC")
     availability_from_smiles.standardizer = None
     assert not availability_from_smiles("OCC")
+
+
+def test_availability_from_smiles_skips_standardization_for_exact_match():
+    standardized: List[str] = []
+
+    def standardizer(smiles: str) -> str:
+        standardized.append(smiles)
+        return canonicalize_smiles(smiles)
+
+    availability_from_smiles = AvailabilityFromSmiles(
+        compounds=["CCO"], standardizer=standardizer
+    )
+
+    assert availability_from_smiles("CCO")
+    assert standardized == []
+
+    assert availability_from_smiles("OCC")
+    assert standardized == ["OCC"]
+
+
+def test_availability_from_smiles_with_standardizer_cache():
+    standardized: List[str] = []
+
+    def standardizer(smiles: str) -> str:
+        standardized.append(smiles)
+        return canonicalize_smiles(smiles)
+
+    availability_from_smiles = AvailabilityFromSmiles(
+        compounds=["CCO"], standardizer=standardizer, standardizer_cache_size=16
+    )
+
+    assert availability_from_smiles("OCC")
+    assert availability_from_smiles("OCC")
+    assert not availability_from_smiles("OCCC")
+    assert standardized == ["OCC", "OCCC"]
+
+    # Also for a standardizer set later
+    standardized.clear()
+    availability_from_smiles.standardizer = standardizer
+    assert availability_from_smiles("OCC")
+    assert availability_from_smiles("OCC")
+    assert standardized == ["OCC"]
+
+
+def test_availability_from_smiles_with_prebuilt_container():
+    class PrefixLookup:
+        """Dummy lookup structure: SMILES strings starting with "CC"."""
+
+        def __contains__(self, item: object) -> bool:
+            return isinstance(item, str) and item.startswith("CC")
+
+    container = PrefixLookup()
+    availability_from_smiles = AvailabilityFromSmiles(compounds=container)
+    assert availability_from_smiles.available_compounds is container
+
+    assert availability_from_smiles("CCO")
+    assert availability_from_smiles("CCCC")
+    assert not availability_from_smiles("OCC")
+
+    class IndexedSeries:
+        """Dummy iterable container, checking its index with "in" (like pandas)."""
+
+        def __iter__(self) -> Iterator[str]:
+            return iter(["CCO"])
+
+        def __contains__(self, item: object) -> bool:
+            return item == 0
+
+    # Iterables are converted, even if they support the "in" operator
+    for compounds in [
+        ["CCO"],
+        {"CCO"},
+        (s for s in ["CCO"]),
+        {"CCO": 1}.keys(),
+        {1: "CCO"}.values(),
+        IndexedSeries(),
+    ]:
+        availability_from_smiles = AvailabilityFromSmiles(compounds=compounds)
+        assert availability_from_smiles.available_compounds == frozenset(["CCO"])
+
+
+def test_availability_from_smiles_with_standardized_compounds():
+    available = ["OCC", "CCO", "C(C)O", "", "invalid", "CCCC"]
+
+    availability_from_smiles = AvailabilityFromSmiles(
+        compounds=available,
+        standardizer=canonicalize_smiles,
+        standardize_compounds=True,
+    )
+    assert availability_from_smiles.available_compounds == frozenset(["CCO", "CCCC"])
+    assert availability_from_smiles("OCC")
+    assert availability_from_smiles("C(C)CC")
+    assert not availability_from_smiles("")
+
+    # Not possible without standardizer
+    with pytest.raises(ValueError):
+        AvailabilityFromSmiles(compounds=available, standardize_compounds=True)
+
+
+def test_availability_match_from_smiles():
+    match = AvailabilityFromSmiles(compounds=["CCO"]).first_match("CCO")
+
+    assert match is not None
+    assert attr.asdict(match) == {
+        "details": 'Matching exact SMILES, "CCO".',
+        "info": {},
+    }
+
+
+def test_availability_from_smiles_weak_reference():
+    availability_from_smiles = AvailabilityFromSmiles(compounds=["CCO"])
+    reference = weakref.ref(availability_from_smiles)
+    assert reference() is availability_from_smiles
@@ -0,0 +1,57 @@
+import pytest
+
+from rxn.availability.availability_from_smiles import AvailabilityFromSmiles
+from rxn.availability.bloom_filter import BloomFilter
+
+
+def test_bloom_filter():
+    compounds = [f"C{'C' * i}O" for i in range(1000)]
+    bloom_filter = BloomFilter.from_items(compounds, error_rate=0.01)
+
+    assert len(bloom_filter) == 1000
+    # No false negatives
+    assert all(compound in bloom_filter for compound in compounds)
+    # Few false positives
+    others = [f"N{'C' * i}N" for i in range(1000)]
+    assert sum(other in bloom_filter for other in others) < 50
+    # Much more compact than the strings themselves
+    assert bloom_filter.num_bits // 8 < 2000
+
+    assert 1 not in bloom_filter
+
+
+def test_bloom_filter_add():
+    bloom_filter = BloomFilter(capacity=10)
+    assert "CCO" not in bloom_filter
+
+    bloom_filter.add("CCO")
+    bloom_filter.update(["CCN", "CCC"])
+    assert "CCO" in bloom_filter
+    assert "CCN" in bloom_filter
+    assert "CCC" in bloom_filter
+    assert len(bloom_filter) == 3
+
+
+def test_bloom_filter_hash_functions():
+    compounds = ["CCO", "CCN", "c1ccccc1"]
+    for hash_name in [None, "blake2b"]:
+        bloom_filter = BloomFilter.from_items(compounds, hash_name=hash_name)
+        assert all(compound in bloom_filter for compound in compounds)
+    assert BloomFilter(capacity=10, hash_name="blake2b").hash_name == "blake2b"
+
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=10, hash_name="md5")
+
+
+def test_bloom_filter_invalid_error_rate():
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=10, error_rate=0.0)
+
+
+def test_availability_from_smiles_with_bloom_filter():
+    bloom_filter = BloomFilter.from_items(["CCO", "CCCC"])
+    availability_from_smiles = AvailabilityFromSmiles(compounds=bloom_filter)
+
+    assert availability_from_smiles.available_compounds is bloom_filter
+    assert availability_from_smiles("CCO")
+    assert availability_from_smiles("CCCC")
@@ -0,0 +1,61 @@
+import pytest
+
+from rxn.availability import AVAILABILITY_METADATA, IsAvailable
+from rxn.availability.availability_from_smiles import AvailabilityFromSmiles
+from rxn.availability.compound_index import CompoundIndex, write_compound_index
+from rxn.availability.is_available import default_standardize_molecules
+
+
+def test_compound_index(tmp_path):
+    compounds = ["CCO", "c1ccccc1", "CCO", "C", "[Na+].[Cl-]", "CC(=O)O"]
+    path = tmp_path / "compounds.idx"
+    write_compound_index(compounds, path)
+
+    compound_index = CompoundIndex(path)
+    assert len(compound_index) == 5
+    assert all(compound in compound_index for compound in compounds)
+    assert "CC" not in compound_index
+    assert "CCOC" not in compound_index
+    assert "" not in compound_index
+    assert 1 not in compound_index
+    compound_index.close()
+
+
+def test_empty_compound_index(tmp_path):
+    path = tmp_path / "compounds.idx"
+    write_compound_index([], path)
+
+    compound_index = CompoundIndex(path)
+    assert len(compound_index) == 0
+    assert "CCO" not in compound_index
+
+
+def test_invalid_compound_index(tmp_path):
+    path = tmp_path / "compounds.txt"
+    path.write_text("CCO\nCCN\n")
+
+    with pytest.raises(ValueError):
+        CompoundIndex(path)
+
+
+def test_availability_from_compound_index(tmp_path):
+    path = tmp_path / "compounds.idx"
+    # The compounds of an index must be standardized beforehand
+    compounds = ["CCO", "CC(Cc1ccc(cc1)C(C(=O)O)C)C"]
+    write_compound_index(
+        (default_standardize_molecules(smiles) for smiles in compounds), path
+    )
+
+    availability_from_smiles = AvailabilityFromSmiles(CompoundIndex(path))
+    assert availability_from_smiles("CCO")
+    assert not availability_from_smiles("CCN")
+
+    is_available_object = IsAvailable(additional_compounds_index_filepath=path)
+    assert is_available_object("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
+    assert is_available_object("OCC")
+    assert not is_available_object("C1=CC=C2C(=C1)C=CC=NN2")
+    assert not is_available_object.is_expandable("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
+    assert (
+        is_available_object.get_availability_metadata("OCC")
+        == AVAILABILITY_METADATA["common"]
+    )
@@ -0,0 +1,211 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from pydantic import ValidationError
+
+from rxn.availability.availability_combiner import AvailabilityCombiner
+from rxn.availability.availability_from_database import AvailabilityFromDatabase
+from rxn.availability.availability_from_smiles import AvailabilityFromSmiles
+from rxn.availability.config import get_settings
+from rxn.availability.databases import (
+    MongoDB,
+    _get_mongo_client,
+    initialize_databases_from_environment_variables,
+)
+
+
+class FakeCollection:
+    """Minimal stand-in for a pymongo collection, recording the queries."""
+
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+        self.queries: List[Dict[str, Any]] = []
+        self.indexes: List[Any] = []
+
+    def create_index(self, keys: Any) -> None:
+        self.indexes.append(keys)
+
+    def find(self, query: Dict[str, Any], projection: Any = None) -> List[Dict]:
+        self.queries.append(query)
+        smiles = query["smile"]
+        allowed = smiles["$in"] if isinstance(smiles, dict) else [smiles]
+        return [dict(d) for d in self.documents if d["smile"] in allowed]
+
+
+def create_database(collection: FakeCollection) -> MongoDB:
+    database = MongoDB(
+        url="mongodb://localhost:27017",
+        db="db",
+        collection="collection",
+        tls_ca_certificate_path=None,
+    )
+    database.mongo_client = {"db": {"collection": collection}}  # type: ignore
+    return database
+
+
+def test_availability_batch():
+    collection = FakeCollection(
+        [
+            {"smile": "CCO", "price_per_amount": 10},
+            {"smile": "CCO", "price_per_amount": "NA"},
+            {"smile": "CCN", "price_per_amount": 200},
+            {"smile": "CCN", "price_per_amount": 150.5},
+            {"smile": "CCC", "price_per_amount": "NA"},
+        ]
+    )
+    database = create_database(collection)
+
+    smis = ["CCO", "CCN", "CCC", "CCCl"]
+    assert database.availability_batch(smis, pricing_threshold=100) == {
+        "CCO": True,
+        "CCN": False,
+        "CCC": False,
+        "CCCl": False,
+    }
+    assert len(collection.queries) == 1
+
+    # The lowest price decides on the availability
+    assert database.availability_batch(["CCN"], pricing_threshold=151) == {"CCN": True}
+
+    # The prices are cached: no additional query
+    assert database.availability_batch(smis) == {
+        "CCO": True,
+        "CCN": True,
+        "CCC": True,
+        "CCCl": False,
+    }
+
+
+def test_availability_from_database_batch():
+    collection = FakeCollection(
+        [
+            {"smile": "CCO", "price_per_amount": 10},
+            {"smile": "CCN", "price_per_amount": 200},
+        ]
+    )
+    availability_from_database = AvailabilityFromDatabase(
+        create_database(collection), pricing_threshold=100
+    )
+
+    smiles_list = ["CCO", "CCN", "CCC"]
+    assert availability_from_database.is_available_batch(smiles_list) == [
+        True,
+        False,
+        False,
+    ]
+    assert len(collection.queries) == 1
+
+    # Also one single query when combined with other sources
+    collection.queries.clear()
+    database = create_database(collection)
+    combined = AvailabilityCombiner(
+        sources=[AvailabilityFromSmiles(["CCC"]), AvailabilityFromDatabase(database)]
+    )
+    assert combined.is_available_batch(smiles_list + ["CCCl"]) == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert len(collection.queries) == 1
+    assert collection.queries[0]["smile"]["$in"] == ["CCO", "CCN", "CCCl"]
+
+
+def test_index_created_once():
+    collection = FakeCollection([{"smile": "CCO", "price_per_amount": 10}])
+    database = create_database(collection)
+
+    assert database.availability("CCO")
+    assert not database.availability("CCN")
+    assert database.availability_batch(["CCO", "CCN"]) == {"CCO": True, "CCN": False}
+
+    assert len(collection.queries) == 2  # the batch query relies on the cache
+    assert collection.indexes == [[("smile", "hashed")]]
+
+
+def test_warmup():
+    collection = FakeCollection([{"smile": "CCO", "price_per_amount": 10}])
+    database = create_database(collection)
+
+    database.warmup(["CCO", "CCN", "CCC"])
+    assert len(collection.queries) == 1
+
+    for smi in ["CCO", "CCN", "CCC"]:
+        database.availability(smi)
+    assert len(collection.queries) == 1
+
+
+def test_initialize_databases_from_environment_variables(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    config_path = tmp_path / "config.json"
+    monkeypatch.setenv("RXN_DATABASE_CONFIG_PATH", str(config_path))
+    get_settings.cache_clear()
+
+    config = {
+        "emolecules": {
+            "uri": "mongodb://localhost:27017",
+            "database": "db",
+            "collection": "collection",
+        }
+    }
+    config_path.write_text(json.dumps(config))
+    databases = initialize_databases_from_environment_variables()
+    assert list(databases) == ["emolecules"]
+    assert isinstance(databases["emolecules"], MongoDB)
+    assert databases["emolecules"].collection == "collection"
+
+    # Missing collection
+    del config["emolecules"]["collection"]
+    config_path.write_text(json.dumps(config))
+    with pytest.raises(ValidationError):
+        initialize_databases_from_environment_variables()
+
+    get_settings.cache_clear()
+
+
+def test_mongo_client_shared():
+    database_1 = MongoDB(
+        url="mongodb://localhost:27017",
+        db="db",
+        collection="collection_1",
+        tls_ca_certificate_path=None,
+    )
+    database_2 = MongoDB(
+        url="mongodb://localhost:27017",
+        db="db",
+        collection="collection_2",
+        tls_ca_certificate_path=None,
+    )
+    database_3 = MongoDB(
+        url="mongodb://localhost:27018",
+        db="db",
+        collection="collection_1",
+        tls_ca_certificate_path=None,
+    )
+
+    assert database_1.mongo_client is database_2.mongo_client
+    assert database_1.mongo_client is not database_3.mongo_client
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_mongo_clients_not_shared_with_forked_processes():
+    client = _get_mongo_client("mongodb://localhost:27017", None)
+    assert _get_mongo_client("mongodb://localhost:27017", None) is client
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child process
+        is_new_client = (
+            _get_mongo_client("mongodb://localhost:27017", None) is not client
+        )
+        os.write(write_fd, b"1" if is_new_client else b"0")
+        os._exit(0)
+
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+    os.close(read_fd)
+    os.close(write_fd)
@@ -0,0 +1,16 @@
+from rxn.availability._regenerate_common_compounds import SOURCE_FILE
+from rxn.availability.defaults import (
+    default_available_compounds,
+    get_compounds_from_file,
+)
+from rxn.availability.is_available import default_standardize_molecules
+
+
+def test_default_available_compounds_are_standardized():
+    # If this fails, the packaged file must be regenerated with
+    # "python -m rxn.availability._regenerate_common_compounds".
+    expected = {
+        default_standardize_molecules(smiles)
+        for smiles in get_compounds_from_file(SOURCE_FILE)
+    }
+    assert default_available_compounds() == expected
@@ -1,6 +1,14 @@
+import copy
+import time
 from pathlib import Path
+from typing import List
 
-from rxn.availability import IsAvailable
+from rxn.availability import AVAILABILITY_METADATA, IsAvailable
+from rxn.availability.availability_from_database import AvailabilityFromDatabase
+from rxn.availability.availability_from_smarts import AvailabilityFromSmarts
+from rxn.availability.availability_from_smiles import AvailabilityFromSmiles
+from rxn.availability.databases import DB
+from rxn.availability.is_available import default_standardize_molecules
 
 compounds_filepath = Path(__file__).parent / "example_compounds.txt"
 
@@ -14,3 +22,186 @@ def test_is_available_object():
     assert is_available_object("B1C2CCCC1CCC2")
     assert is_available_object("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
     assert not is_available_object("C1=CC=C2C(=C1)C=CC=NN2")
+
+
+def test_is_available_cache():
+    is_available_object = IsAvailable(always_available=["CCO"])
+
+    assert is_available_object("CCO")
+    assert is_available_object("OCC")  # same after standardization: cache hit
+    assert not is_available_object("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
+    assert is_available_object.cache_info()["availability"].hits == 1
+    assert is_available_object.cache_info()["availability"].currsize == 2
+
+    metadata = is_available_object.get_availability_metadata("OCC")
+    assert metadata == is_available_object.get_availability_metadata("CCO")
+    assert is_available_object.cache_info()["metadata"].hits == 1
+
+    is_available_object.clear_cache()
+    assert is_available_object.cache_info()["availability"].currsize == 0
+    assert is_available_object.cache_info()["metadata"].currsize == 0
+
+
+def test_is_available_standardization_cache():
+    standardized: List[str] = []
+
+    def standardizer(smiles: str) -> str:
+        standardized.append(smiles)
+        return default_standardize_molecules(smiles)
+
+    is_available_object = IsAvailable(
+        always_available=["CCO"], standardization_function=standardizer
+    )
+    assert is_available_object("OCC")
+    assert is_available_object("OCC")
+    is_available_object("[Na+]~[Cl-]")
+    is_available_object("[Na+]~[Cl-]")
+    assert standardized == ["OCC", "[Na+].[Cl-]"]
+
+
+def test_is_available_batch():
+    is_available_object = IsAvailable(
+        always_available=["CCO"], excluded=["B1C2CCCC1CCC2"]
+    )
+    smiles_list = ["OCC", "B1C2CCCC1CCC2", "CC(Cc1ccc(cc1)C(C(=O)O)C)C", "[Na+]", "OCC"]
+
+    assert is_available_object.is_available_batch(smiles_list) == [
+        is_available_object(smiles) for smiles in smiles_list
+    ]
+    assert is_available_object.is_available_batch(smiles_list, max_workers=2) == [
+        True,
+        False,
+        False,
+        True,
+        True,
+    ]
+
+
+def test_is_expandable():
+    is_available_object = IsAvailable(
+        always_available=["CCO"], avoid_substructure=["[OH]"]
+    )
+
+    # Default compounds and user compounds are not expandable, independently
+    # of the exclusions
+    assert not is_available_object.is_expandable("B1C2CCCC1CCC2")
+    assert not is_available_object.is_expandable("OCC")
+    assert is_available_object.is_expandable("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
+
+    # The exclusions apply to the default queries
+    assert not is_available_object("OCC")
+    match = is_available_object._get_first_availability_match("B1C2CCCC1CCC2")
+    assert match is not None
+    source = match.info[is_available_object.key_for_source_instance]
+    assert source is is_available_object.from_default_compounds
+
+
+def test_is_available_update_after_construction():
+    ibuprofen = "CC(C)Cc1ccc(C(C)C(=O)O)cc1"
+    cinnoline = "C1=Cc2ccccc2NN=C1"
+    is_available_object = IsAvailable(model_available=[ibuprofen])
+    assert is_available_object(ibuprofen)
+    assert not is_available_object(cinnoline)
+
+    is_available_object.are_materials_exclusive = True
+    assert not is_available_object(ibuprofen)
+    is_available_object.are_materials_exclusive = False
+    assert is_available_object(ibuprofen)
+
+    is_available_object.from_user = AvailabilityFromSmiles([cinnoline])
+    assert is_available_object(cinnoline)
+    assert is_available_object.is_available_batch([cinnoline, ibuprofen]) == [
+        True,
+        True,
+    ]
+    is_available_object.from_model = AvailabilityFromSmiles([])
+    assert not is_available_object(ibuprofen)
+    assert is_available_object.is_available_batch([cinnoline, ibuprofen]) == [
+        True,
+        False,
+    ]
+
+
+def test_is_available_metadata_category():
+    # Matched by a default regex, and available for the model: reported as a
+    # common compound, whatever the order in which the sources are queried
+    is_available_object = IsAvailable(model_available=["[Xe+]", "C1=Cc2ccccc2NN=C1"])
+
+    assert is_available_object("[Xe+]")
+    assert (
+        is_available_object.get_availability_metadata("[Xe+]")
+        == AVAILABILITY_METADATA["common"]
+    )
+    assert (
+        is_available_object.get_availability_metadata("C1=Cc2ccccc2NN=C1")
+        == AVAILABILITY_METADATA["model"]
+    )
+
+
+class FakeDB(DB):
+    def __init__(self, compounds: List[str]):
+        super().__init__(url="")
+        self.compounds = compounds
+
+    def availability(self, smi: str, pricing_threshold: int = 0) -> bool:
+        return smi in self.compounds
+
+
+def test_is_available_replace_sources():
+    cinnoline = "C1=Cc2ccccc2NN=C1"
+    is_available_object = IsAvailable()
+    assert is_available_object("CCO")
+    assert not is_available_object(cinnoline)
+
+    is_available_object.excluded_compounds = AvailabilityFromSmiles(["CCO"])
+    assert not is_available_object("CCO")
+    is_available_object.excluded_compounds = AvailabilityFromSmiles([])
+    is_available_object.excluded_substructures = AvailabilityFromSmarts(["[O;H1]"])
+    assert not is_available_object("CCO")
+    is_available_object.excluded_substructures = AvailabilityFromSmarts([])
+    assert is_available_object("CCO")
+
+    is_available_object.from_default_compounds = AvailabilityFromSmiles([cinnoline])
+    assert is_available_object(cinnoline)
+
+    is_available_object.from_database["fake"] = AvailabilityFromDatabase(
+        FakeDB(["CC(C)Cc1ccc(C(C)C(=O)O)cc1"])
+    )
+    assert is_available_object("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
+    assert (
+        is_available_object.get_availability_metadata("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
+        == AVAILABILITY_METADATA["database"]
+    )
+    del is_available_object.from_database["fake"]
+    assert not is_available_object("CC(Cc1ccc(cc1)C(C(=O)O)C)C")
+
+    assert not is_available_object("CC(C)(C)CCC(C)(C)C")
+    is_available_object.standardization_function = lambda smiles: cinnoline
+    assert is_available_object("CC(C)(C)CCC(C)(C)C")
+
+
+def test_is_available_copy():
+    cinnoline = "C1=Cc2ccccc2NN=C1"
+    is_available_object = IsAvailable()
+    assert not is_available_object(cinnoline)
+
+    for copied in [copy.copy(is_available_object), copy.deepcopy(is_available_object)]:
+        copied.from_user = AvailabilityFromSmiles([cinnoline])
+        assert copied(cinnoline)
+        assert not is_available_object(cinnoline)
+        copied.from_database["fake"] = AvailabilityFromDatabase(FakeDB(["CCCCCCCCCC"]))
+        assert "fake" not in is_available_object.from_database
+        assert copied("CCCCCCCCCC")
+        assert not is_available_object("CCCCCCCCCC")
+
+
+def test_is_available_cache_ttl():
+    fake_db = FakeDB(["CCCCCCCCCC"])
+    is_available_object = IsAvailable(cache_ttl=0.0)
+    is_available_object.from_database["fake"] = AvailabilityFromDatabase(fake_db)
+    assert is_available_object("CCCCCCCCCC")
+
+    # The change in the database is visible once the cached availability expired
+    fake_db.compounds = []
+    time.sleep(0.001)
+    assert not is_available_object("CCCCCCCCCC")
@@ -1,6 +1,17 @@
+import copy
+import pickle
+import time
+from typing import List
+
 from rxn.chemutils.conversion import canonicalize_smiles
 
-from rxn.availability.utils import wrap_standardizer_with_tilde_substitution
+from rxn.availability.utils import (
+    CacheInfo,
+    LRUCache,
+    cache_standardizer,
+    map_in_threads,
+    wrap_standardizer_with_tilde_substitution,
+)
 
 
 def test_wrap_standardizer_with_tilde_substitution():
@@ -19,3 +30,71 @@ def test_wrap_standardizer_with_tilde_substitution():
     # wrapped standardizer works.
     assert wrapped_standardizer("[Na+]~[H-]") == "[H-].[Na+]"
     assert standardizer("[Na+]~[H-]") == "[NaH+]"
+
+
+def test_cache_standardizer():
+    standardized: List[str] = []
+
+    def standardizer(smiles: str) -> str:
+        standardized.append(smiles)
+        return canonicalize_smiles(smiles)
+
+    cached_standardizer = cache_standardizer(standardizer, maxsize=2)
+    assert cached_standardizer("OCC") == "CCO"
+    assert cached_standardizer("OCC") == "CCO"
+    assert cached_standardizer("C(C)C") == "CCC"
+    assert cached_standardizer("NCC") == "CCN"
+    assert cached_standardizer("OCC") == "CCO"  # was discarded from the cache
+    assert standardized == ["OCC", "C(C)C", "NCC", "OCC"]
+
+    # Same with the tilde substitution
+    standardized.clear()
+    wrapped_standardizer = wrap_standardizer_with_tilde_substitution(
+        standardizer, cache_size=8
+    )
+    assert wrapped_standardizer("[Na+]~[Cl-]") == "[Cl-].[Na+]"
+    assert wrapped_standardizer("[Na+]~[Cl-]") == "[Cl-].[Na+]"
+    assert standardized == ["[Na+].[Cl-]"]
+
+
+def test_map_in_threads():
+    smiles_list = ["C(C)O", "OC", "C(C).OC", "O.C.N"]
+    expected = [canonicalize_smiles(smiles) for smiles in smiles_list]
+
+    assert map_in_threads(canonicalize_smiles, smiles_list) == expected
+    assert map_in_threads(canonicalize_smiles, smiles_list, max_workers=1) == expected
+    assert map_in_threads(canonicalize_smiles, smiles_list, max_workers=3) == expected
+    assert map_in_threads(canonicalize_smiles, [], max_workers=3) == []
+
+
+def test_lru_cache():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # "b" is the least recently used one
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.info() == CacheInfo(hits=3, misses=1, maxsize=2, currsize=2)
+
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_lru_cache_with_ttl():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2, ttl=0.0)
+    cache.put("a", 1)
+    time.sleep(0.001)
+    assert cache.get("a") is None
+
+
+def test_lru_cache_copy():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.put("a", 1)
+
+    for copied in [copy.deepcopy(cache), pickle.loads(pickle.dumps(cache))]:
+        assert copied.get("a") == 1
+        copied.put("b", 2)
+        assert cache.get("b") is None